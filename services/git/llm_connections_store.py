@@ -109,8 +109,10 @@ class LLMConnectionsStore:
 
         path = self._path(connection_id)
         try:
-            path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)  # 0o600
+            # Created 0o600 up front: the API key is never briefly world-readable
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, stat.S_IRUSR | stat.S_IWUSR)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(payload, ensure_ascii=False, indent=2))
         except Exception as e:
             if path.exists():
                 try:
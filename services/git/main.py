@@ -1,16 +1,23 @@
 import os
+import re
+import shutil
 import subprocess
 import tempfile
+import time
+import uuid
+import weakref
 import asyncio
 import json as _json
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
+from urllib.parse import quote
 from typing import Literal, Optional
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import httpx
 from shared.errors import setup_all_error_handlers
 from shared.settings import CORS_ORIGINS, LOG_LEVEL, LOG_FORMAT_JSON
@@ -29,6 +36,7 @@ from ssh_manager import SSHKeyManager
 from token_store import APITokenStore
 from repo_connections_store import RepoConnectionsStore, RepoConnection
 from llm_connections_store import LLMConnectionsStore
+from repo_cache import RepoMirrorCache
 
 # Environment variables
 WORKSPACE_DIR = Path(os.getenv("WORKSPACE_DIR", "/workspace"))
@@ -39,6 +47,9 @@ AZURE_DEVOPS_TOKEN = os.getenv("AZURE_DEVOPS_TOKEN", "")
 AZURE_DEVOPS_ORG = os.getenv("AZURE_DEVOPS_ORG", "")
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "gpt-oss:20b")
+GIT_MIRROR_CACHE = os.getenv("GIT_MIRROR_CACHE", "false").lower() in ("1", "true", "yes")
+GIT_MIRROR_DIR = Path(os.getenv("GIT_MIRROR_DIR", str(WORKSPACE_DIR / ".mirrors")))
+GIT_MIRROR_REFRESH_SECONDS = int(os.getenv("GIT_MIRROR_REFRESH_SECONDS", "300"))
 
 # Initialize SSH key manager
 ssh_manager = SSHKeyManager(SSH_KEYS_DIR)
@@ -47,15 +58,52 @@ ssh_manager = SSHKeyManager(SSH_KEYS_DIR)
 api_token_store = APITokenStore(SSH_KEYS_DIR / "api-tokens")
 repo_connections_store = RepoConnectionsStore(SSH_KEYS_DIR / "repo-connections")
 llm_connections_store = LLMConnectionsStore(SSH_KEYS_DIR / "llm-connections")
+# Optional warm bare mirrors used as --reference for repeat clones of the same upstream.
+repo_mirror_cache = RepoMirrorCache(GIT_MIRROR_DIR) if GIT_MIRROR_CACHE else None
 
 logger = get_logger(__name__)
 
+# Short-lived cache of validated repo paths (repo_path string -> (expires_at, Path)).
+# Polling clients hit /status etc. with the same repo_path repeatedly; this skips
+# re-running sanitize_path + the exists()/.git stat calls within the TTL window.
+_REPO_PATH_CACHE_TTL = 5.0
+_REPO_PATH_CACHE_MAX = 128
+_repo_path_cache: dict[str, tuple[float, Path]] = {}
+
+# Concurrency limits for clone/sync: a global cap on parallel git network
+# operations plus a per-repo lock so two syncs never race on one working tree.
+GIT_MAX_PARALLEL = int(os.getenv("GIT_MAX_PARALLEL", "4"))
+_git_semaphore = asyncio.Semaphore(GIT_MAX_PARALLEL)
+# Entries vanish once no request holds or awaits the lock, so the map stays bounded.
+_repo_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+# Short-lived cache of stored provider tokens (token_id -> (expires_at, provider, token)).
+# Saves a secrets-file read per clone/sync call; entries are dropped when a token is deleted.
+_TOKEN_CACHE_TTL = 60.0
+_TOKEN_CACHE_MAX = 512
+_token_cache: dict[str, tuple[float, str, str]] = {}
+
+# Reusable GIT_ASKPASS envs for repeated syncs of the same connection
+# ("<connection_id>:<api_token_id>" -> (expires_at, env)).
+_cred_ctx_cache: dict[str, tuple[float, dict]] = {}
+
+
+async def _refresh_mirrors_periodically():
+    while True:
+        await asyncio.sleep(GIT_MIRROR_REFRESH_SECONDS)
+        await repo_mirror_cache.refresh_all(run_git_command_async, env=with_network_config())
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     setup_logging("git", level=LOG_LEVEL, json_output=LOG_FORMAT_JSON)
+    refresh_task = asyncio.create_task(_refresh_mirrors_periodically()) if repo_mirror_cache else None
     logger.info("Git service ready")
     yield
+    if refresh_task:
+        refresh_task.cancel()
+    invalidate_sync_credentials()
+    remove_askpass_script()
     logger.info("Git service stopped")
 
 
@@ -159,6 +207,7 @@ class MergeRequestCheckout(BaseModel):
     repo_path: str
     mr_number: int
     provider: Literal["github", "gitlab", "azure"]
+    fetch_head_only: bool = False  # Only resolve the PR/MR head SHA via ls-remote, no fetch/checkout
 
 class SSHKeyUpload(BaseModel):
     """Request body for uploading an SSH key."""
@@ -186,6 +235,21 @@ def now_iso():
     return datetime.now(timezone.utc).isoformat()
 
 
+def get_stored_token(token_id: str) -> tuple[str, str]:
+    """Return (provider, token value) for a stored token, cached for a short TTL."""
+    cached = _token_cache.get(token_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1], cached[2]
+
+    provider = api_token_store.get_metadata(token_id).get("provider")
+    token = api_token_store.get_token_value(token_id)
+
+    if len(_token_cache) >= _TOKEN_CACHE_MAX:
+        _token_cache.clear()
+    _token_cache[token_id] = (time.monotonic() + _TOKEN_CACHE_TTL, provider, token)
+    return provider, token
+
+
 def get_provider_token(provider: Literal["github", "gitlab", "azure"], token_id: str | None) -> str:
     """Resolve a provider token.
 
@@ -193,8 +257,7 @@ def get_provider_token(provider: Literal["github", "gitlab", "azure"], token_id:
     Otherwise, fall back to environment-configured tokens.
     """
     if token_id:
-        raw = api_token_store.get_raw(token_id)
-        stored_provider = raw.get("provider")
+        stored_provider, token = get_stored_token(token_id)
         if provider == "azure":
             expected = "azureDevOps"
         else:
@@ -204,7 +267,7 @@ def get_provider_token(provider: Literal["github", "gitlab", "azure"], token_id:
                 status_code=400,
                 detail=f"Token provider mismatch: token is '{stored_provider}', requested provider is '{expected}'",
             )
-        return api_token_store.get_token_value(token_id)
+        return token
 
     if provider == "github":
         return GITHUB_TOKEN
@@ -214,18 +277,45 @@ def get_provider_token(provider: Literal["github", "gitlab", "azure"], token_id:
         return AZURE_DEVOPS_TOKEN
     return ""
 
+GIT_COMMAND_TIMEOUT = 300
+
+# Transfer tuning for clone/pull/fetch, passed as GIT_CONFIG_* env entries
+# (equivalent to `-c key=value`): HTTP/2 multiplexes requests over one TLS
+# connection, and 0 lets git pick a thread/job count from the CPU count.
+GIT_NETWORK_CONFIG = {
+    "http.version": "HTTP/2",
+    "pack.threads": "0",
+    "fetch.parallel": "0",
+    "submodule.fetchJobs": "0",
+}
+
+
+def with_network_config(env: dict | None = None) -> dict:
+    """Return `env` extended with GIT_NETWORK_CONFIG (caller's entries win)."""
+    merged = {"GIT_CONFIG_COUNT": str(len(GIT_NETWORK_CONFIG))}
+    for i, (key, value) in enumerate(GIT_NETWORK_CONFIG.items()):
+        merged[f"GIT_CONFIG_KEY_{i}"] = key
+        merged[f"GIT_CONFIG_VALUE_{i}"] = value
+    if env:
+        merged.update(env)
+    return merged
+
+
 def run_git_command(args: list[str], cwd: Path | None = None, env: dict | None = None) -> tuple[str, str, int]:
-    """Run a git command and return (stdout, stderr, returncode)."""
+    """Run a git command and return (stdout, stderr, returncode).
+
+    The working directory is passed to git via `-C` rather than as the
+    subprocess cwd, so the child does not chdir before exec.
+    """
     try:
         merged_env = os.environ.copy()
         if env:
             merged_env.update(env)
         result = subprocess.run(
-            ["git"] + args,
-            cwd=cwd or WORKSPACE_DIR,
+            ["git", "-C", str(cwd or WORKSPACE_DIR)] + args,
             capture_output=True,
             text=True,
-            timeout=300,
+            timeout=GIT_COMMAND_TIMEOUT,
             env=merged_env,
         )
         return result.stdout, result.stderr, result.returncode
@@ -235,10 +325,60 @@ def run_git_command(args: list[str], cwd: Path | None = None, env: dict | None =
         raise HTTPException(status_code=500, detail=f"Git command failed: {str(e)}")
 
 
+async def run_git_command_async(args: list[str], cwd: Path | None = None, env: dict | None = None) -> tuple[str, str, int]:
+    """Async variant of `run_git_command` for long-running network operations.
+
+    Uses asyncio subprocesses so clones/pulls don't block the event loop.
+    """
+    merged_env = os.environ.copy()
+    if env:
+        merged_env.update(env)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "git", "-C", str(cwd or WORKSPACE_DIR), *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=merged_env,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Git command failed: {str(e)}")
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=GIT_COMMAND_TIMEOUT)
+    except BaseException as e:
+        # Timeout, client disconnect or shutdown: don't leave git writing into a
+        # repo whose lock/slot is about to be released.
+        if proc.returncode is None:
+            proc.kill()
+            await asyncio.shield(proc.wait())
+        if isinstance(e, asyncio.TimeoutError):
+            raise HTTPException(status_code=504, detail="Git command timed out")
+        raise
+    return (
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+        proc.returncode,
+    )
+
+
+@asynccontextmanager
+async def git_repo_slot(repo_key: str):
+    """Hold the per-repo lock and a global git slot for the duration of the block."""
+    lock = _repo_locks.setdefault(repo_key, asyncio.Lock())
+    # Take the repo lock first so requests queued on a busy repo don't hold a global slot.
+    async with lock, _git_semaphore:
+        yield
+
+
 def redact_secret(text: str, secret: str) -> str:
+    # str.replace is a linear-time C substring scan; no regex needed for a literal.
+    # git echoes credentials embedded in URLs percent-encoded, so redact that form too.
     if not text or not secret:
         return text
-    return text.replace(secret, "***")
+    text = text.replace(secret, "***")
+    encoded = quote(secret, safe="")
+    if encoded != secret:
+        text = text.replace(encoded, "***")
+    return text
 
 
 def git_https_username_for_provider(provider: Literal["github", "gitlab", "azure"]) -> str:
@@ -252,14 +392,9 @@ def git_https_username_for_provider(provider: Literal["github", "gitlab", "azure
     return "token"
 
 
-def build_git_askpass_env(provider: Literal["github", "gitlab", "azure"], token: str) -> tuple[dict, callable]:
-    """Create a temporary GIT_ASKPASS script env for HTTPS token auth.
-
-    Returns (env_overrides, cleanup_fn).
-    """
-    username = git_https_username_for_provider(provider)
-    # Script uses prompt text to decide whether Git asks for username or password.
-    script = """#!/bin/sh
+# Answers Git's username/password prompts from GIT_HTTP_USERNAME / GIT_HTTP_PASSWORD.
+# The script holds no secret, so one copy is shared by every git process.
+_ASKPASS_SCRIPT = """#!/bin/sh
 case "$1" in
   *Username*) echo "$GIT_HTTP_USERNAME";;
   *username*) echo "$GIT_HTTP_USERNAME";;
@@ -268,33 +403,76 @@ case "$1" in
   *) echo "";;
 esac
 """
+_askpass_path: Path | None = None
 
-    fd, path = tempfile.mkstemp(prefix="git-askpass-", suffix=".sh")
-    os.close(fd)
-    p = Path(path)
-    p.write_text(script, encoding="utf-8")
-    try:
-        os.chmod(p, 0o700)
-    except Exception:
-        pass
 
-    env = {
+def get_askpass_script() -> Path:
+    """Return the shared GIT_ASKPASS script, writing it on first use."""
+    global _askpass_path
+    if _askpass_path is None:
+        fd, path = tempfile.mkstemp(prefix="git-askpass-", suffix=".sh")
+        os.close(fd)
+        p = Path(path)
+        p.write_text(_ASKPASS_SCRIPT, encoding="utf-8")
+        try:
+            os.chmod(p, 0o700)
+        except Exception:
+            pass
+        _askpass_path = p
+    return _askpass_path
+
+
+def remove_askpass_script() -> None:
+    """Delete the shared GIT_ASKPASS script (on shutdown); the next use rewrites it."""
+    global _askpass_path
+    if _askpass_path is not None:
+        _askpass_path.unlink(missing_ok=True)
+        _askpass_path = None
+
+
+def build_git_askpass_env(provider: Literal["github", "gitlab", "azure"], token: str) -> dict:
+    """Build the GIT_ASKPASS env overrides for HTTPS token auth."""
+    return {
         "GIT_TERMINAL_PROMPT": "0",
-        "GIT_ASKPASS": str(p),
-        "GIT_HTTP_USERNAME": username,
+        "GIT_ASKPASS": str(get_askpass_script()),
+        "GIT_HTTP_USERNAME": git_https_username_for_provider(provider),
         "GIT_HTTP_PASSWORD": token,
     }
 
-    def cleanup():
-        try:
-            p.unlink(missing_ok=True)
-        except Exception:
-            pass
+def get_sync_credentials(conn: RepoConnection) -> dict:
+    """Return the GIT_ASKPASS env for a token-authenticated connection.
+
+    The env is built once per (connection, token) and reused across pulls
+    until the TTL expires or the connection/token is deleted.
+    """
+    key = f"{conn.id}:{conn.api_token_id}"
+    cached = _cred_ctx_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    provider = provider_from_repo_url(conn.repo_url)
+    token = get_provider_token(provider, conn.api_token_id)
+    if not token:
+        raise HTTPException(status_code=400, detail="Provider token not configured")
+    env = build_git_askpass_env(provider, token)
+    _cred_ctx_cache[key] = (time.monotonic() + _TOKEN_CACHE_TTL, env)
+    return env
+
+
+def invalidate_sync_credentials(connection_id: str | None = None, token_id: str | None = None) -> None:
+    """Drop cached credential envs (all of them if no filter is given)."""
+    for key in list(_cred_ctx_cache):
+        cid, tid = key.split(":", 1)
+        if (connection_id is None and token_id is None) or cid == connection_id or tid == token_id:
+            del _cred_ctx_cache[key]
 
-    return env, cleanup
 
 def get_repo_path(repo_path: str) -> Path:
     """Get absolute path to repository, ensure it's within workspace."""
+    cached = _repo_path_cache.get(repo_path)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
     # Validate and sanitize the path
     path = sanitize_path(repo_path, WORKSPACE_DIR)
     
@@ -302,8 +480,17 @@ def get_repo_path(repo_path: str) -> Path:
         raise HTTPException(status_code=404, detail=f"Repository path not found: {repo_path}")
     if not (path / ".git").exists():
         raise HTTPException(status_code=400, detail=f"Not a git repository: {repo_path}")
+
+    if len(_repo_path_cache) >= _REPO_PATH_CACHE_MAX:
+        _repo_path_cache.clear()
+    _repo_path_cache[repo_path] = (time.monotonic() + _REPO_PATH_CACHE_TTL, path)
     return path
 
+
+def invalidate_repo_path_cache() -> None:
+    """Drop cached repo path lookups (call after the workspace layout changes)."""
+    _repo_path_cache.clear()
+
 def parse_remote_url(repo_url: str) -> tuple[str, str, str]:
     """Parse git remote URL to determine provider, org, and repo name.
     Returns: (provider, org, repo)
@@ -339,8 +526,9 @@ async def clone_repository(payload: CloneRequest):
     validated_url = validate_repo_url(payload.repo_url)
     
     # Configure SSH if key is provided
+    env = None
     if payload.ssh_key_name:
-        ssh_manager.configure_git_ssh(payload.ssh_key_name)
+        env = ssh_manager.configure_git_ssh(payload.ssh_key_name)["env"]
     
     # Validate and determine target directory
     if payload.target_dir:
@@ -350,9 +538,6 @@ async def clone_repository(payload: CloneRequest):
         repo_name = Path(validated_url).stem.replace('.git', '')
         target = validate_target_dir(repo_name, WORKSPACE_DIR)
     
-    if target.exists():
-        raise HTTPException(status_code=400, detail=f"Target directory already exists: {target.name}")
-    
     # Validate branch name if provided
     if payload.branch:
         validate_branch_name(payload.branch)
@@ -361,11 +546,18 @@ async def clone_repository(payload: CloneRequest):
     if payload.branch:
         args.extend(["-b", payload.branch])
     
-    stdout, stderr, code = run_git_command(args)
+    # One clone/pull per repo at a time, and a global cap on concurrent git work
+    async with git_repo_slot(target.name):
+        if target.exists():
+            raise HTTPException(status_code=400, detail=f"Target directory already exists: {target.name}")
+        
+        stdout, stderr, code = await run_git_command_async(args, env=with_network_config(env))
     
     if code != 0:
         raise HTTPException(status_code=500, detail=f"Clone failed: {stderr}")
     
+    invalidate_repo_path_cache()
+    
     return {
         "success": True,
         "repo_path": target.name,
@@ -378,8 +570,9 @@ async def pull_changes(payload: PullRequest):
     repo_path = get_repo_path(payload.repo_path)
     
     # Configure SSH if key is provided
+    env = None
     if payload.ssh_key_name:
-        ssh_manager.configure_git_ssh(payload.ssh_key_name)
+        env = ssh_manager.configure_git_ssh(payload.ssh_key_name)["env"]
     
     # Validate branch name if provided
     if payload.branch:
@@ -389,7 +582,7 @@ async def pull_changes(payload: PullRequest):
     if payload.branch:
         args.extend(["origin", payload.branch])
     
-    stdout, stderr, code = run_git_command(args, cwd=repo_path)
+    stdout, stderr, code = run_git_command(args, cwd=repo_path, env=env)
     
     if code != 0:
         raise HTTPException(status_code=500, detail=f"Pull failed: {stderr}")
@@ -406,8 +599,9 @@ async def push_changes(payload: PushRequest):
     repo_path = get_repo_path(payload.repo_path)
     
     # Configure SSH if key is provided
+    env = None
     if payload.ssh_key_name:
-        ssh_manager.configure_git_ssh(payload.ssh_key_name)
+        env = ssh_manager.configure_git_ssh(payload.ssh_key_name)["env"]
     
     # Validate branch name if provided
     if payload.branch:
@@ -419,7 +613,7 @@ async def push_changes(payload: PushRequest):
     if payload.branch:
         args.extend(["origin", payload.branch])
     
-    stdout, stderr, code = run_git_command(args, cwd=repo_path)
+    stdout, stderr, code = run_git_command(args, cwd=repo_path, env=env)
     
     if code != 0:
         raise HTTPException(status_code=500, detail=f"Push failed: {stderr}")
@@ -601,9 +795,9 @@ async def write_file(payload: FileWriteRequest):
     # Create parent directories if they don't exist
     file_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Write file
+    # Write file (newline="" keeps the caller's line endings byte-for-byte)
     try:
-        file_path.write_text(payload.content, encoding="utf-8")
+        file_path.write_text(payload.content, encoding="utf-8", newline="")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to write file: {str(e)}")
     
@@ -618,6 +812,57 @@ async def write_file(payload: FileWriteRequest):
         "message": f"File written successfully: {payload.file_path}"
     }
 
+@app.post("/file/write-stream", tags=["files"])
+async def write_file_stream(repo_path: str, file_path: str, request: Request, branch: str | None = None):
+    """Stream the raw request body to a file in the repository.
+    
+    Same semantics as `/file/write`, but the content is sent as the raw body
+    and written chunk by chunk, so memory use stays bounded for large files.
+    """
+    repo = get_repo_path(repo_path)
+    
+    # Checkout branch if specified
+    if branch:
+        validated_branch = validate_branch_name(branch)
+        stdout, stderr, code = run_git_command(["checkout", validated_branch], cwd=repo)
+        if code != 0:
+            raise HTTPException(status_code=500, detail=f"Failed to checkout branch {branch}: {stderr}")
+    
+    # Sanitize file path to prevent traversal attacks
+    target = sanitize_path(file_path, repo)
+    
+    # Create parent directories if they don't exist
+    target.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Stream into a temp file next to the target and swap it in only once the
+    # whole body has arrived, so a failed upload leaves the existing file intact
+    tmp = target.parent / f".{target.name}.{uuid.uuid4().hex}.tmp"
+    try:
+        f = await asyncio.to_thread(open, tmp, "xb")
+        try:
+            async for chunk in request.stream():
+                if chunk:
+                    await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        if target.exists():
+            shutil.copymode(target, tmp)
+        os.replace(tmp, target)
+    except BaseException as e:
+        tmp.unlink(missing_ok=True)
+        if isinstance(e, ClientDisconnect):
+            raise HTTPException(status_code=400, detail="Upload interrupted: client disconnected")
+        if isinstance(e, Exception):
+            raise HTTPException(status_code=500, detail=f"Failed to write file: {str(e)}")
+        raise
+    
+    return {
+        "success": True,
+        "file_path": str(target.relative_to(repo)),
+        "size_bytes": target.stat().st_size,
+        "message": f"File written successfully: {file_path}"
+    }
+
 @app.post("/merge-request/create")
 async def create_merge_request(payload: MergeRequestCreate):
     """Create a merge/pull request on the Git provider."""
@@ -666,52 +911,61 @@ async def checkout_merge_request(payload: MergeRequestCheckout):
         )
     
     if provider == "github":
-        # Fetch PR ref
-        ref = f"pull/{payload.mr_number}/head:pr-{payload.mr_number}"
-        stdout, stderr, code = run_git_command(["fetch", "origin", ref], cwd=repo_path)
-        
-        if code != 0:
-            raise HTTPException(status_code=500, detail=f"Failed to fetch PR: {stderr}")
-        
-        # Checkout the PR branch
-        stdout, stderr, code = run_git_command(["checkout", f"pr-{payload.mr_number}"], cwd=repo_path)
-        
-        if code != 0:
-            raise HTTPException(status_code=500, detail=f"Failed to checkout PR: {stderr}")
-        
-        return {
-            "success": True,
-            "branch": f"pr-{payload.mr_number}",
-            "message": f"Checked out GitHub PR #{payload.mr_number}"
-        }
-    
+        remote_ref = f"pull/{payload.mr_number}/head"
+        local_branch = f"pr-{payload.mr_number}"
+        label = f"GitHub PR #{payload.mr_number}"
+        kind = "PR"
     elif provider == "gitlab":
-        # Fetch MR ref
-        ref = f"merge-requests/{payload.mr_number}/head:mr-{payload.mr_number}"
-        stdout, stderr, code = run_git_command(["fetch", "origin", ref], cwd=repo_path)
+        remote_ref = f"merge-requests/{payload.mr_number}/head"
+        local_branch = f"mr-{payload.mr_number}"
+        label = f"GitLab MR !{payload.mr_number}"
+        kind = "MR"
+    elif provider == "azure":
+        raise HTTPException(
+            status_code=501,
+            detail="Azure DevOps PR checkout not yet implemented"
+        )
+    
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported provider: {provider}")
+    
+    if payload.fetch_head_only:
+        # Single round-trip: resolve the head SHA without transferring any objects
+        stdout, stderr, code = run_git_command(["ls-remote", "origin", f"refs/{remote_ref}"], cwd=repo_path)
         
         if code != 0:
-            raise HTTPException(status_code=500, detail=f"Failed to fetch MR: {stderr}")
-        
-        stdout, stderr, code = run_git_command(["checkout", f"mr-{payload.mr_number}"], cwd=repo_path)
+            raise HTTPException(status_code=500, detail=f"Failed to resolve {kind}: {stderr}")
         
-        if code != 0:
-            raise HTTPException(status_code=500, detail=f"Failed to checkout MR: {stderr}")
+        head_sha = stdout.split()[0] if stdout.strip() else None
+        if not head_sha:
+            raise HTTPException(status_code=404, detail=f"{label} not found")
         
         return {
             "success": True,
-            "branch": f"mr-{payload.mr_number}",
-            "message": f"Checked out GitLab MR !{payload.mr_number}"
+            "head_sha": head_sha,
+            "message": f"Resolved {label} head"
         }
     
-    elif provider == "azure":
-        raise HTTPException(
-            status_code=501,
-            detail="Azure DevOps PR checkout not yet implemented"
-        )
+    # Fetch only the PR/MR ref (no tags); objects shared with the base are already local
+    stdout, stderr, code = run_git_command(
+        ["fetch", "--no-tags", "origin", f"{remote_ref}:{local_branch}"],
+        cwd=repo_path
+    )
     
-    else:
-        raise HTTPException(status_code=400, detail=f"Unsupported provider: {provider}")
+    if code != 0:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch {kind}: {stderr}")
+    
+    # Checkout the PR/MR branch
+    stdout, stderr, code = run_git_command(["checkout", local_branch], cwd=repo_path)
+    
+    if code != 0:
+        raise HTTPException(status_code=500, detail=f"Failed to checkout {kind}: {stderr}")
+    
+    return {
+        "success": True,
+        "branch": local_branch,
+        "message": f"Checked out {label}"
+    }
 
 async def create_github_pr(org: str, repo: str, payload: MergeRequestCreate) -> dict:
     """Create a GitHub Pull Request."""
@@ -870,7 +1124,8 @@ async def create_azure_pr(org: str, repo: str, payload: MergeRequestCreate) -> d
 )
 async def upload_ssh_key(payload: SSHKeyUpload):
     """Upload and store an SSH key for Git operations."""
-    return ssh_manager.add_key(
+    return await asyncio.to_thread(
+        ssh_manager.add_key,
         key_name=payload.key_name,
         private_key=payload.private_key,
         public_key=payload.public_key
@@ -932,7 +1187,7 @@ async def upload_ssh_key(payload: SSHKeyUpload):
 )
 async def list_ssh_keys():
     """List all stored SSH keys."""
-    return ssh_manager.list_keys()
+    return await asyncio.to_thread(ssh_manager.list_keys)
 
 
 @app.get(
@@ -987,7 +1242,7 @@ async def list_ssh_keys():
 )
 async def get_ssh_key(key_name: str):
     """Get information about a specific SSH key."""
-    return ssh_manager.get_key(key_name)
+    return await asyncio.to_thread(ssh_manager.get_key, key_name)
 
 
 @app.delete(
@@ -1033,7 +1288,7 @@ async def get_ssh_key(key_name: str):
 )
 async def delete_ssh_key(key_name: str):
     """Delete an SSH key from storage."""
-    return ssh_manager.delete_key(key_name)
+    return await asyncio.to_thread(ssh_manager.delete_key, key_name)
 
 
 # === API Token Management Endpoints ===
@@ -1065,7 +1320,8 @@ Tokens are stored as secrets in the git service volume and are never returned in
 """,
 )
 async def list_api_tokens() -> list[APITokenInfo]:
-    return [t.__dict__ for t in api_token_store.list()]
+    tokens = await asyncio.to_thread(api_token_store.list)
+    return [t.__dict__ for t in tokens]
 
 
 @app.post(
@@ -1078,7 +1334,8 @@ The token value is never returned; the response contains only metadata.
 """,
 )
 async def create_api_token(payload: APITokenCreate) -> APITokenInfo:
-    created = api_token_store.create(
+    created = await asyncio.to_thread(
+        api_token_store.create,
         provider=payload.provider,
         name=payload.name,
         token=payload.token,
@@ -1093,7 +1350,9 @@ async def create_api_token(payload: APITokenCreate) -> APITokenInfo:
     summary="Delete an API token",
 )
 async def delete_api_token(token_id: str):
-    api_token_store.delete(token_id)
+    await asyncio.to_thread(api_token_store.delete, token_id)
+    _token_cache.pop(token_id, None)
+    invalidate_sync_credentials(token_id=token_id)
     return {"id": token_id, "deleted": True}
 
 
@@ -1108,6 +1367,10 @@ class RepoConnectionCreate(BaseModel):
     api_token_id: str | None = None
     repo_type: Literal["test_repository", "application_repository"] | None = None
     linked_repo_id: str | None = None
+    # Shallow clone depth; defaults to 1 when a branch is given. 0 forces a full clone.
+    depth: int | None = Field(default=None, ge=0)
+    # Partial clone filter (objects are fetched lazily on demand)
+    filter: Literal["blob:none", "tree:0"] | None = None
 
 
 class RepoConnectionInfo(BaseModel):
@@ -1131,15 +1394,18 @@ class RepoConnectionUpdate(BaseModel):
     linked_repo_id: str | None = None
 
 
+_PROVIDER_HOST_RE = re.compile(r"github\.com|gitlab\.com|dev\.azure\.com|visualstudio\.com", re.IGNORECASE)
+_PROVIDER_BY_HOST = {
+    "github.com": "github",
+    "gitlab.com": "gitlab",
+    "dev.azure.com": "azure",
+    "visualstudio.com": "azure",
+}
+
+
 def provider_from_repo_url(repo_url: str) -> Literal["github", "gitlab", "azure", "unknown"]:
-    url = (repo_url or "").lower()
-    if "github.com" in url:
-        return "github"
-    if "gitlab.com" in url:
-        return "gitlab"
-    if "dev.azure.com" in url or "visualstudio.com" in url:
-        return "azure"
-    return "unknown"
+    m = _PROVIDER_HOST_RE.search(repo_url or "")
+    return _PROVIDER_BY_HOST[m.group(0).lower()] if m else "unknown"
 
 
 @app.get(
@@ -1160,6 +1426,11 @@ async def list_repo_connections() -> list[RepoConnectionInfo]:
 Auth:
 - Prefer `ssh_key_name` (uses existing SSH key management).
 - Or specify `api_token_id` to use a stored provider token over HTTPS via GIT_ASKPASS.
+
+Clone size:
+- `depth` makes a shallow, single-branch clone. Defaults to 1 when `branch` is set;
+  pass 0 for full history.
+- `filter` (`blob:none` or `tree:0`) makes a partial clone that fetches objects lazily.
 """,
 )
 async def connect_repo(payload: RepoConnectionCreate) -> RepoConnectionInfo:
@@ -1188,34 +1459,46 @@ async def connect_repo(payload: RepoConnectionCreate) -> RepoConnectionInfo:
         repo_name = Path(validated_url).stem.replace(".git", "")
         target = validate_target_dir(repo_name, WORKSPACE_DIR)
 
-    if target.exists():
-        raise HTTPException(status_code=400, detail=f"Target directory already exists: {target.name}")
+    # One clone/pull per repo at a time, and a global cap on concurrent git work
+    async with git_repo_slot(target.name):
+        if target.exists():
+            raise HTTPException(status_code=400, detail=f"Target directory already exists: {target.name}")
 
-    env = None
-    cleanup = None
-    auth_type: Literal["api-token", "ssh-key", "none"] = "none"
+        env = None
+        auth_type: Literal["api-token", "ssh-key", "none"] = "none"
 
-    try:
         if payload.ssh_key_name:
-            ssh_manager.configure_git_ssh(payload.ssh_key_name)
+            env = ssh_manager.configure_git_ssh(payload.ssh_key_name)["env"]
             auth_type = "ssh-key"
         elif payload.api_token_id:
             token = get_provider_token(provider, payload.api_token_id)
             if not token:
                 raise HTTPException(status_code=400, detail="Provider token not configured")
-            env, cleanup = build_git_askpass_env(provider, token)
+            env = build_git_askpass_env(provider, token)
             auth_type = "api-token"
 
         args = ["clone", validated_url, str(target)]
         if payload.branch:
             args.extend(["-b", payload.branch])
+        depth = payload.depth if payload.depth is not None else (1 if payload.branch else 0)
+        if depth:
+            args.extend([f"--depth={depth}", "--single-branch"])
+        if payload.filter:
+            args.append(f"--filter={payload.filter}")
+        if repo_mirror_cache and not depth and not payload.filter:
+            # Full clones borrow objects from the warm mirror, then copy them (--dissociate)
+            mirror = await repo_mirror_cache.ensure(
+                validated_url, run_git_command_async, env=with_network_config(env)
+            )
+            if mirror:
+                args.extend(["--reference", str(mirror), "--dissociate"])
 
-        stdout, stderr, code = run_git_command(args, env=env)
+        stdout, stderr, code = await run_git_command_async(args, env=with_network_config(env))
         if code != 0:
             # Best-effort redaction if git prints the token anywhere.
             if payload.api_token_id:
                 try:
-                    secret = api_token_store.get_token_value(payload.api_token_id)
+                    _, secret = get_stored_token(payload.api_token_id)
                     stderr = redact_secret(stderr, secret)
                 except Exception:
                     pass
@@ -1225,8 +1508,10 @@ async def connect_repo(payload: RepoConnectionCreate) -> RepoConnectionInfo:
                 raise HTTPException(status_code=400, detail=f"Clone failed (access denied): {stderr.strip()}")
             raise HTTPException(status_code=500, detail=f"Clone failed: {stderr.strip()}")
 
+        invalidate_repo_path_cache()
+
         # Ensure origin URL is stored without credentials.
-        run_git_command(["remote", "set-url", "origin", validated_url], cwd=target)
+        await run_git_command_async(["remote", "set-url", "origin", validated_url], cwd=target)
 
         provider_label = "azureDevOps" if provider == "azure" else provider
         conn = repo_connections_store.create(
@@ -1241,9 +1526,6 @@ async def connect_repo(payload: RepoConnectionCreate) -> RepoConnectionInfo:
             linked_repo_id=payload.linked_repo_id,
         )
         return conn.__dict__
-    finally:
-        if cleanup:
-            cleanup()
 
 
 @app.post(
@@ -1255,28 +1537,25 @@ async def sync_repo_connection(connection_id: str) -> RepoConnectionInfo:
     conn = repo_connections_store.get(connection_id)
     repo_path = get_repo_path(conn.repo_path)
 
-    env = None
-    cleanup = None
-    try:
+    async with git_repo_slot(conn.repo_path):
+        env = None
         if conn.ssh_key_name:
-            ssh_manager.configure_git_ssh(conn.ssh_key_name)
+            env = ssh_manager.configure_git_ssh(conn.ssh_key_name)["env"]
         elif conn.api_token_id:
-            provider = provider_from_repo_url(conn.repo_url)
-            token = get_provider_token(provider, conn.api_token_id)
-            if not token:
-                raise HTTPException(status_code=400, detail="Provider token not configured")
-            env, cleanup = build_git_askpass_env(provider, token)
+            env = get_sync_credentials(conn)
 
         args = ["pull"]
         if conn.branch:
             validate_branch_name(conn.branch)
             args.extend(["origin", conn.branch])
 
-        stdout, stderr, code = run_git_command(args, cwd=repo_path, env=env)
+        stdout, stderr, code = await run_git_command_async(args, cwd=repo_path, env=with_network_config(env))
         if code != 0:
             if conn.api_token_id:
+                # Don't keep reusing credentials that may have been rotated/revoked.
+                invalidate_sync_credentials(connection_id=conn.id)
                 try:
-                    secret = api_token_store.get_token_value(conn.api_token_id)
+                    _, secret = get_stored_token(conn.api_token_id)
                     stderr = redact_secret(stderr, secret)
                 except Exception:
                     pass
@@ -1291,9 +1570,6 @@ async def sync_repo_connection(connection_id: str) -> RepoConnectionInfo:
         )
         repo_connections_store.update(updated)
         return updated.__dict__
-    finally:
-        if cleanup:
-            cleanup()
 
 
 @app.delete(
@@ -1304,6 +1580,7 @@ async def sync_repo_connection(connection_id: str) -> RepoConnectionInfo:
 )
 async def disconnect_repo(connection_id: str):
     repo_connections_store.delete(connection_id)
+    invalidate_sync_credentials(connection_id=connection_id)
     return {"id": connection_id, "deleted": True}
 
 
@@ -0,0 +1,83 @@
+"""Warm bare mirrors for connected repositories.
+
+Keeps one `git clone --mirror` per upstream URL under a cache directory, so
+repeat connects of the same repository only transfer objects that are not
+already on disk. Working trees are cloned with `--reference <mirror>
+--dissociate`, so they never depend on the mirror once the clone finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import shutil
+import weakref
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+GitRunner = Callable[..., Awaitable[tuple[str, str, int]]]
+
+
+class RepoMirrorCache:
+    """Manages bare mirrors keyed by repository URL."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Per-mirror locks, dropped once no caller holds or awaits them
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def mirror_path(self, repo_url: str) -> Path:
+        digest = hashlib.sha256(repo_url.encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{digest}.git"
+
+    async def ensure(self, repo_url: str, run_git: GitRunner, env: Optional[dict] = None) -> Optional[Path]:
+        """Create or refresh the mirror for `repo_url`.
+
+        Returns the mirror path, or None if the mirror could not be created
+        (callers then fall back to a plain clone).
+        """
+        path = self.mirror_path(repo_url)
+        lock = self._locks.setdefault(path.name, asyncio.Lock())
+        async with lock:
+            if (path / "HEAD").exists():
+                try:
+                    _, stderr, code = await run_git(["fetch", "--prune"], cwd=path, env=env)
+                    if code != 0:
+                        logger.warning("Mirror refresh failed for %s: %s", path.name, stderr.strip())
+                except Exception as exc:
+                    logger.warning("Mirror refresh failed for %s: %s", path.name, exc)
+                # A stale mirror is still a valid reference; the clone fetches the rest.
+                return path
+
+            try:
+                _, stderr, code = await run_git(["clone", "--mirror", repo_url, str(path)], env=env)
+            except Exception as exc:
+                code, stderr = -1, str(exc)
+            if code != 0:
+                logger.warning("Mirror clone failed for %s: %s", path.name, stderr.strip())
+                shutil.rmtree(path, ignore_errors=True)
+                return None
+            return path
+
+    async def refresh_all(self, run_git: GitRunner, env: Optional[dict] = None) -> None:
+        """Fetch every mirror (best effort; mirrors needing credentials may fail).
+
+        `env` is added to the fetch environment, which never prompts for credentials.
+        """
+        fetch_env = {**(env or {}), "GIT_TERMINAL_PROMPT": "0"}
+        for path in sorted(self.cache_dir.glob("*.git")):
+            lock = self._locks.setdefault(path.name, asyncio.Lock())
+            async with lock:
+                try:
+                    _, stderr, code = await run_git(
+                        ["fetch", "--prune"], cwd=path, env=fetch_env
+                    )
+                    if code != 0:
+                        logger.warning("Mirror refresh failed for %s: %s", path.name, stderr.strip())
+                except Exception as exc:
+                    logger.warning("Mirror refresh failed for %s: %s", path.name, exc)
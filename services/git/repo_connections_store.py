@@ -6,21 +6,25 @@ service volume. This is intentionally metadata-only; secrets stay in `token_stor
 
 from __future__ import annotations
 
-import json
 import os
 import stat
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Literal, Optional
 from uuid import uuid4
 
+import orjson
 from fastapi import HTTPException
 
 Provider = Literal["github", "gitlab", "azureDevOps", "unknown"]
 AuthType = Literal["api-token", "ssh-key", "none"]
 RepoType = Literal["test_repository", "application_repository"]
 
+# fsync record writes before the rename (slower, survives power loss)
+DURABLE_WRITES = os.getenv("REPOSTORE_DURABLE", "").lower() in ("1", "true", "yes")
+
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -43,7 +47,34 @@ class RepoConnection:
     linked_repo_id: Optional[str] = None
 
 
+_FIELDS = tuple(f.name for f in fields(RepoConnection))
+_FIELD_DEFAULTS: dict = {
+    **dict.fromkeys(_FIELDS),
+    "repo_url": "",
+    "provider": "unknown",
+    "repo_path": "",
+    "created_at": "",
+    "status": "connected",
+    "auth_type": "none",
+}
+_STR_FIELDS = ("repo_url", "repo_path", "created_at", "status")
+_OPTIONAL_FIELDS = (
+    "last_synced_at",
+    "api_token_id",
+    "ssh_key_name",
+    "branch",
+    "repo_type",
+    "linked_repo_id",
+)
+
+
 class RepoConnectionsStore:
+    """File-backed repo connection store with an in-memory index.
+
+    All records are read once at construction; reads are then served from
+    memory and writes update both the JSON file and the index.
+    """
+
     def __init__(self, base_dir: Path):
         self.base_dir = base_dir
         self.base_dir.mkdir(parents=True, exist_ok=True)
@@ -51,63 +82,67 @@ class RepoConnectionsStore:
             os.chmod(self.base_dir, 0o700)
         except Exception:
             pass
+        self._lock = threading.Lock()
+        self._index: dict[str, RepoConnection] = self._load_all()
 
     def _path(self, connection_id: str) -> Path:
         return self.base_dir / f"{connection_id}.json"
 
-    def list(self) -> list[RepoConnection]:
-        items: list[RepoConnection] = []
+    def _write(self, path: Path, conn: RepoConnection) -> None:
+        """Atomically replace `path` with the JSON record for `conn` (0o600).
+
+        Writes to a temp file and renames it over the target, so a crash never
+        leaves a truncated record. fsync only when REPOSTORE_DURABLE is set.
+        """
+        # orjson serializes dataclasses natively; no intermediate dict
+        data = orjson.dumps(conn, option=orjson.OPT_INDENT_2)
+        tmp = path.with_suffix(".json.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.S_IRUSR | stat.S_IWUSR)
+        try:
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                if DURABLE_WRITES:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp, path)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _from_raw(raw: dict, fallback_id: str) -> RepoConnection:
+        """Build a RepoConnection from a stored record, tolerating missing/extra keys."""
+        d = {**_FIELD_DEFAULTS, **{k: raw[k] for k in _FIELDS if k in raw}}
+        d["id"] = str(d["id"] or fallback_id)
+        for key in _STR_FIELDS:
+            d[key] = str(d[key])
+        for key in _OPTIONAL_FIELDS:
+            d[key] = d[key] or None
+        return RepoConnection(**d)
+
+    def _load_all(self) -> dict[str, RepoConnection]:
+        index: dict[str, RepoConnection] = {}
         for file in self.base_dir.glob("*.json"):
             try:
-                raw = json.loads(file.read_text(encoding="utf-8"))
-                items.append(
-                    RepoConnection(
-                        id=str(raw.get("id") or file.stem),
-                        repo_url=str(raw.get("repo_url", "")),
-                        provider=raw.get("provider", "unknown"),
-                        repo_path=str(raw.get("repo_path", "")),
-                        created_at=str(raw.get("created_at", "")),
-                        last_synced_at=raw.get("last_synced_at") or None,
-                        status=str(raw.get("status", "connected")),
-                        auth_type=raw.get("auth_type", "none"),
-                        api_token_id=raw.get("api_token_id") or None,
-                        ssh_key_name=raw.get("ssh_key_name") or None,
-                        branch=raw.get("branch") or None,
-                        repo_type=raw.get("repo_type") or None,
-                        linked_repo_id=raw.get("linked_repo_id") or None,
-                    )
-                )
+                conn = self._from_raw(orjson.loads(file.read_bytes()), file.stem)
+                index[file.stem] = conn
             except Exception:
                 continue
+        return index
 
+    def list(self) -> list[RepoConnection]:
+        items = list(self._index.values())
         items.sort(key=lambda r: r.created_at or "", reverse=True)
         return items
 
     def get(self, connection_id: str) -> RepoConnection:
-        path = self._path(connection_id)
-        if not path.exists():
+        conn = self._index.get(connection_id)
+        if conn is None:
             raise HTTPException(status_code=404, detail="Repo connection not found")
-        try:
-            raw = json.loads(path.read_text(encoding="utf-8"))
-            return RepoConnection(
-                id=str(raw.get("id") or connection_id),
-                repo_url=str(raw.get("repo_url", "")),
-                provider=raw.get("provider", "unknown"),
-                repo_path=str(raw.get("repo_path", "")),
-                created_at=str(raw.get("created_at", "")),
-                last_synced_at=raw.get("last_synced_at") or None,
-                status=str(raw.get("status", "connected")),
-                auth_type=raw.get("auth_type", "none"),
-                api_token_id=raw.get("api_token_id") or None,
-                ssh_key_name=raw.get("ssh_key_name") or None,
-                branch=raw.get("branch") or None,
-                repo_type=raw.get("repo_type") or None,
-                linked_repo_id=raw.get("linked_repo_id") or None,
-            )
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to read repo connection: {str(e)}")
+        return conn
 
     def create(
         self,
@@ -125,35 +160,7 @@ class RepoConnectionsStore:
         connection_id = uuid4().hex
         created_at = now_iso()
 
-        payload = {
-            "id": connection_id,
-            "repo_url": repo_url,
-            "provider": provider,
-            "repo_path": repo_path,
-            "created_at": created_at,
-            "last_synced_at": None,
-            "status": "connected",
-            "auth_type": auth_type,
-            "api_token_id": api_token_id,
-            "ssh_key_name": ssh_key_name,
-            "branch": branch,
-            "repo_type": repo_type,
-            "linked_repo_id": linked_repo_id,
-        }
-
-        path = self._path(connection_id)
-        try:
-            path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)  # 0o600
-        except Exception as e:
-            if path.exists():
-                try:
-                    path.unlink()
-                except Exception:
-                    pass
-            raise HTTPException(status_code=500, detail=f"Failed to store repo connection: {str(e)}")
-
-        return RepoConnection(
+        conn = RepoConnection(
             id=connection_id,
             repo_url=repo_url,
             provider=provider,
@@ -169,39 +176,36 @@ class RepoConnectionsStore:
             linked_repo_id=linked_repo_id,
         )
 
+        path = self._path(connection_id)
+        try:
+            self._write(path, conn)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to store repo connection: {str(e)}")
+
+        with self._lock:
+            self._index[connection_id] = conn
+        return conn
+
     def update(self, connection: RepoConnection) -> RepoConnection:
-        path = self._path(connection.id)
-        if not path.exists():
+        if connection.id not in self._index:
             raise HTTPException(status_code=404, detail="Repo connection not found")
-
-        payload = {
-            "id": connection.id,
-            "repo_url": connection.repo_url,
-            "provider": connection.provider,
-            "repo_path": connection.repo_path,
-            "created_at": connection.created_at,
-            "last_synced_at": connection.last_synced_at,
-            "status": connection.status,
-            "auth_type": connection.auth_type,
-            "api_token_id": connection.api_token_id,
-            "ssh_key_name": connection.ssh_key_name,
-            "branch": connection.branch,
-            "repo_type": connection.repo_type,
-            "linked_repo_id": connection.linked_repo_id,
-        }
+        path = self._path(connection.id)
 
         try:
-            path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
-            return connection
+            self._write(path, connection)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to update repo connection: {str(e)}")
+        with self._lock:
+            self._index[connection.id] = connection
+        return connection
 
     def delete(self, connection_id: str) -> None:
-        path = self._path(connection_id)
-        if not path.exists():
+        if connection_id not in self._index:
             raise HTTPException(status_code=404, detail="Repo connection not found")
+        path = self._path(connection_id)
         try:
-            path.unlink()
+            path.unlink(missing_ok=True)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to delete repo connection: {str(e)}")
+        with self._lock:
+            self._index.pop(connection_id, None)
@@ -5,13 +5,27 @@ Provides secure storage and management of SSH keys for Git operations.
 """
 
 import os
+import re
 import stat
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 from fastapi import HTTPException
 import subprocess
 
 
+# Maximum number of cached ssh-keygen fingerprints per manager
+FINGERPRINT_CACHE_SIZE = 256
+
+# Maximum concurrent ssh-keygen processes when listing keys
+KEYGEN_CONCURRENCY = 10
+
+# Key names: ASCII alphanumerics, underscores and hyphens
+VALID_KEY_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
 class SSHKeyManager:
     """Manages SSH keys for Git operations."""
     
@@ -30,6 +44,62 @@ class SSHKeyManager:
         
         # Known hosts file
         self.known_hosts_path = self.keys_dir / "known_hosts"
+        
+        # LRU fingerprint cache: key path -> ((st_ino, st_size, st_mtime_ns), fingerprint)
+        self._fingerprint_cache: OrderedDict[str, tuple[tuple[int, int, int], str]] = OrderedDict()
+        # Key handlers run in worker threads; guards every _fingerprint_cache access
+        self._fingerprint_lock = threading.Lock()
+        
+        # Host key checking options appended to every get_ssh_command_args() result
+        self._host_key_args = [
+            "-o", "StrictHostKeyChecking=accept-new",
+            "-o", f"UserKnownHostsFile={self.known_hosts_path}"
+        ]
+    
+    @staticmethod
+    def _stamp(st: os.stat_result) -> tuple[int, int, int]:
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    
+    @staticmethod
+    def _run_keygen(key_path: str) -> str:
+        """Run `ssh-keygen -l` for a key and return its fingerprint line."""
+        result = subprocess.run(
+            ["ssh-keygen", "-l", "-f", key_path],
+            capture_output=True,
+            text=True
+        )
+        return result.stdout.strip() if result.returncode == 0 else "Unknown"
+    
+    def _cached_fingerprint(self, key_path: str, stamp: tuple[int, int, int]) -> Optional[str]:
+        with self._fingerprint_lock:
+            cached = self._fingerprint_cache.get(key_path)
+            if cached and cached[0] == stamp:
+                self._fingerprint_cache.move_to_end(key_path)
+                return cached[1]
+            return None
+    
+    def _store_fingerprint(self, key_path: str, stamp: tuple[int, int, int], fingerprint: str) -> None:
+        with self._fingerprint_lock:
+            self._fingerprint_cache[key_path] = (stamp, fingerprint)
+            self._fingerprint_cache.move_to_end(key_path)
+            if len(self._fingerprint_cache) > FINGERPRINT_CACHE_SIZE:
+                self._fingerprint_cache.popitem(last=False)
+    
+    def _drop_fingerprint(self, key_path: str) -> None:
+        with self._fingerprint_lock:
+            self._fingerprint_cache.pop(key_path, None)
+    
+    def _fingerprint(self, key_path: str, st: os.stat_result) -> str:
+        """
+        Return the ssh-keygen fingerprint for a key, reusing a cached value
+        while the file's inode/size/mtime are unchanged.
+        """
+        stamp = self._stamp(st)
+        fingerprint = self._cached_fingerprint(key_path, stamp)
+        if fingerprint is None:
+            fingerprint = self._run_keygen(key_path)
+            self._store_fingerprint(key_path, stamp, fingerprint)
+        return fingerprint
     
     def add_key(self, key_name: str, private_key: str, public_key: Optional[str] = None) -> dict:
         """
@@ -47,7 +117,7 @@ class SSHKeyManager:
             HTTPException: If key validation or storage fails
         """
         # Validate key name (alphanumeric, underscore, hyphen only)
-        if not key_name.replace("_", "").replace("-", "").isalnum():
+        if not VALID_KEY_NAME_PATTERN.fullmatch(key_name):
             raise HTTPException(
                 status_code=400,
                 detail="Key name must contain only alphanumeric characters, underscores, and hyphens"
@@ -70,35 +140,55 @@ class SSHKeyManager:
                 detail=f"SSH key '{key_name}' already exists"
             )
         
+        # Validate before anything touches disk: derive the public key from
+        # stdin (-P "" fails fast on passphrase-protected keys instead of
+        # prompting), then fingerprint the derived public key.
         try:
-            # Write private key with secure permissions
-            private_key_path.write_text(private_key.strip() + "\n")
-            os.chmod(private_key_path, stat.S_IRUSR | stat.S_IWUSR)  # 0o600
-            
-            # Write public key if provided
-            if public_key:
-                public_key_path.write_text(public_key.strip() + "\n")
-                os.chmod(public_key_path, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)  # 0o644
-            
-            # Validate key using ssh-keygen
+            derived = subprocess.run(
+                ["ssh-keygen", "-y", "-P", "", "-f", "/dev/stdin"],
+                input=private_key.strip() + "\n",
+                capture_output=True,
+                text=True
+            )
+            if derived.returncode != 0:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid SSH key: {derived.stderr}"
+                )
             result = subprocess.run(
-                ["ssh-keygen", "-l", "-f", str(private_key_path)],
+                ["ssh-keygen", "-l", "-f", "-"],
+                input=derived.stdout,
                 capture_output=True,
                 text=True
             )
-            
             if result.returncode != 0:
-                # Clean up invalid key
-                private_key_path.unlink()
-                if public_key and public_key_path.exists():
-                    public_key_path.unlink()
                 raise HTTPException(
                     status_code=400,
                     detail=f"Invalid SSH key: {result.stderr}"
                 )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to validate SSH key: {str(e)}"
+            )
+        
+        # Extract key fingerprint from ssh-keygen output
+        fingerprint = result.stdout.strip()
+        
+        try:
+            # Create the private key 0o600 from the start (O_EXCL: never clobber)
+            fd = os.open(private_key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, stat.S_IRUSR | stat.S_IWUSR)
+            with os.fdopen(fd, "w") as f:
+                f.write(private_key.strip() + "\n")
+            
+            # Write public key if provided
+            if public_key:
+                public_key_path.write_text(public_key.strip() + "\n")
+                os.chmod(public_key_path, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)  # 0o644
             
-            # Extract key fingerprint from ssh-keygen output
-            fingerprint = result.stdout.strip()
+            self._drop_fingerprint(str(private_key_path))
             
             return {
                 "key_name": key_name,
@@ -107,8 +197,11 @@ class SSHKeyManager:
                 "path": str(private_key_path)
             }
         
-        except HTTPException:
-            raise
+        except FileExistsError:
+            raise HTTPException(
+                status_code=409,
+                detail=f"SSH key '{key_name}' already exists"
+            )
         except Exception as e:
             # Clean up on error
             if private_key_path.exists():
@@ -127,39 +220,42 @@ class SSHKeyManager:
         Returns:
             List of key information dicts
         """
-        keys = []
-        
-        for key_file in self.keys_dir.glob("*"):
-            # Skip non-key files
-            if key_file.suffix in [".pub", ".config"] or key_file.name in ["config", "known_hosts"]:
+        with os.scandir(self.keys_dir) as entries:
+            entries = [e for e in entries if e.is_file(follow_symlinks=False)]
+        names = {e.name for e in entries}
+        
+        # Skip non-key files
+        key_entries = []
+        for entry in entries:
+            if entry.name.endswith((".pub", ".config")) or entry.name in ("config", "known_hosts"):
                 continue
-            
-            if key_file.is_file():
-                # Get key fingerprint
-                try:
-                    result = subprocess.run(
-                        ["ssh-keygen", "-l", "-f", str(key_file)],
-                        capture_output=True,
-                        text=True
-                    )
-                    
-                    fingerprint = result.stdout.strip() if result.returncode == 0 else "Unknown"
-                    
-                    # Check for public key
-                    pub_key_path = key_file.with_suffix(".pub")
-                    has_public_key = pub_key_path.exists()
-                    
-                    keys.append({
-                        "key_name": key_file.name,
-                        "fingerprint": fingerprint,
-                        "has_public_key": has_public_key,
-                        "path": str(key_file)
-                    })
-                except Exception:
-                    # Skip invalid keys
-                    continue
-        
-        return keys
+            try:
+                key_entries.append((entry, self._stamp(entry.stat(follow_symlinks=False))))
+            except OSError:
+                continue
+        
+        # Fingerprint cache misses in parallel: one ssh-keygen per key, bounded pool
+        fingerprints = {
+            entry.path: self._cached_fingerprint(entry.path, stamp)
+            for entry, stamp in key_entries
+        }
+        misses = [(entry, stamp) for entry, stamp in key_entries if fingerprints[entry.path] is None]
+        if misses:
+            with ThreadPoolExecutor(max_workers=min(KEYGEN_CONCURRENCY, len(misses))) as pool:
+                results = pool.map(self._run_keygen, [entry.path for entry, _ in misses])
+                for (entry, stamp), fingerprint in zip(misses, results):
+                    fingerprints[entry.path] = fingerprint
+                    self._store_fingerprint(entry.path, stamp, fingerprint)
+        
+        return [
+            {
+                "key_name": entry.name,
+                "fingerprint": fingerprints[entry.path],
+                "has_public_key": f"{entry.name}.pub" in names,
+                "path": entry.path
+            }
+            for entry, _ in key_entries
+        ]
     
     def get_key(self, key_name: str) -> dict:
         """
@@ -176,29 +272,26 @@ class SSHKeyManager:
         """
         key_path = self.keys_dir / key_name
         
-        if not key_path.exists() or not key_path.is_file():
+        # Single stat answers both "exists" and "is a regular file"
+        try:
+            st = key_path.stat()
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
             raise HTTPException(
                 status_code=404,
                 detail=f"SSH key '{key_name}' not found"
             )
         
         # Get fingerprint
-        result = subprocess.run(
-            ["ssh-keygen", "-l", "-f", str(key_path)],
-            capture_output=True,
-            text=True
-        )
-        
-        fingerprint = result.stdout.strip() if result.returncode == 0 else "Unknown"
-        
-        # Check for public key
-        pub_key_path = key_path.with_suffix(".pub")
-        has_public_key = pub_key_path.exists()
+        fingerprint = self._fingerprint(str(key_path), st)
         
         # Read public key if it exists
-        public_key_content = None
-        if has_public_key:
-            public_key_content = pub_key_path.read_text().strip()
+        try:
+            public_key_content = (self.keys_dir / f"{key_name}.pub").read_text().strip()
+        except FileNotFoundError:
+            public_key_content = None
+        has_public_key = public_key_content is not None
         
         return {
             "key_name": key_name,
@@ -231,6 +324,7 @@ class SSHKeyManager:
         
         # Delete private key
         key_path.unlink()
+        self._drop_fingerprint(str(key_path))
         
         # Delete public key if exists
         pub_key_path = key_path.with_suffix(".pub")
@@ -264,10 +358,7 @@ class SSHKeyManager:
             ssh_args = ["-i", str(key_path)]
         
         # Add strict host key checking options
-        ssh_args.extend([
-            "-o", "StrictHostKeyChecking=accept-new",
-            "-o", f"UserKnownHostsFile={self.known_hosts_path}"
-        ])
+        ssh_args.extend(self._host_key_args)
         
         return ssh_args
     
@@ -279,16 +370,17 @@ class SSHKeyManager:
             key_name: Optional specific key to use
         
         Returns:
-            Configuration details
+            Configuration details, including an `env` dict with
+            GIT_SSH_COMMAND to pass to the git subprocess. The process
+            environment is not modified, so concurrent requests using
+            different keys don't interfere.
         """
         ssh_args = self.get_ssh_command_args(key_name)
         ssh_command = f"ssh {' '.join(ssh_args)}"
         
-        # Set GIT_SSH_COMMAND environment variable
-        os.environ["GIT_SSH_COMMAND"] = ssh_command
-        
         return {
             "ssh_command": ssh_command,
             "key_used": key_name,
-            "configured": True
+            "configured": True,
+            "env": {"GIT_SSH_COMMAND": ssh_command}
         }
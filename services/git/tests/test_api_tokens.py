@@ -29,3 +29,22 @@ async def test_api_tokens_crud(client):
     # Ensure deleted
     listed2 = (await client.get("/api-tokens")).json()
     assert not any(t["id"] == created["id"] for t in listed2)
+
+
+@pytest.mark.asyncio
+async def test_deleted_token_is_not_served_from_cache(client):
+    import main
+
+    created = (
+        await client.post(
+            "/api-tokens",
+            json={"provider": "gitlab", "name": "bot", "token": "glpat-abcdef123456"},
+        )
+    ).json()
+
+    assert main.get_provider_token("gitlab", created["id"]) == "glpat-abcdef123456"
+    assert created["id"] in main._token_cache
+
+    resp = await client.delete(f"/api-tokens/{created['id']}")
+    assert resp.status_code == 200
+    assert created["id"] not in main._token_cache
@@ -1,63 +1,44 @@
 """
 Tests for the /file/write endpoint in Git service.
 """
-import pytest
-import tempfile
+import json
 import shutil
-from pathlib import Path
-from httpx import AsyncClient, ASGITransport
-from unittest.mock import patch, MagicMock
-import os
-import importlib
-
-# Capture the original WORKSPACE_DIR (set by conftest) before any fixture overrides it.
-_ORIGINAL_WORKSPACE = os.environ.get("WORKSPACE_DIR")
 
+import pytest
+from starlette.requests import ClientDisconnect, Request
 
-@pytest.fixture(scope="function")
-def test_workspace():
-    """Create a temporary workspace for tests."""
-    workspace = Path(tempfile.mkdtemp(prefix="git_file_write_test_"))
-    
-    # Set environment variable
-    os.environ["WORKSPACE_DIR"] = str(workspace)
-    
-    yield workspace
-    
-    # Cleanup temp dir (env var is restored by client fixture teardown)
-    shutil.rmtree(workspace, ignore_errors=True)
+# 1MB payload for the large-file test, serialized once at import
+LARGE_CONTENT_SIZE = 1024 * 1024
+_LARGE_WRITE_BODY = json.dumps({
+    "repo_path": "test-repo",
+    "file_path": "large.spec.js",
+    "content": "a" * LARGE_CONTENT_SIZE
+}).encode("utf-8")
 
 
 @pytest.fixture
-async def client(test_workspace):
-    """Create test client for git service."""
-    # Import main after setting env vars
-    import main as main_module
-    importlib.reload(main_module)
-    app = main_module.app
+def test_workspace(workspace_dir):
+    """Workspace for file write tests (main.WORKSPACE_DIR points at it)."""
+    return workspace_dir
+
+
+@pytest.fixture(scope="session")
+def _repo_template(tmp_path_factory):
+    """Build the mock git repository layout once per session."""
+    template = tmp_path_factory.mktemp("repo_tpl") / "test-repo"
+    (template / ".git").mkdir(parents=True)
     
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
-        yield ac
+    # Create a simple git config
+    (template / ".git" / "config").write_text("[core]\n\trepositoryformatversion = 0\n")
     
-    # Restore original WORKSPACE_DIR and reload main BEFORE test_workspace
-    # teardown deletes the temp dir, so subsequent test modules see the correct path.
-    if _ORIGINAL_WORKSPACE:
-        os.environ["WORKSPACE_DIR"] = _ORIGINAL_WORKSPACE
-    importlib.reload(main_module)
+    return template
 
 
 @pytest.fixture
-def mock_git_repo(test_workspace):
+def mock_git_repo(test_workspace, _repo_template):
     """Create a mock git repository in workspace."""
     repo_path = test_workspace / "test-repo"
-    repo_path.mkdir()
-    (repo_path / ".git").mkdir()
-    
-    # Create a simple git config
-    git_config = repo_path / ".git" / "config"
-    git_config.write_text("[core]\n\trepositoryformatversion = 0\n")
-    
+    shutil.copytree(_repo_template, repo_path)
     return repo_path
 
 
@@ -108,29 +89,25 @@ async def test_file_write_creates_directories(client, mock_git_repo):
 
 
 @pytest.mark.asyncio
-async def test_file_write_with_branch_checkout(client, mock_git_repo):
+async def test_file_write_with_branch_checkout(client, mock_git_repo, git_cmd):
     """Test file write with branch checkout."""
-    # Mock git checkout command
-    with patch('main.run_git_command') as mock_run:
-        mock_run.return_value = ("", "", 0)
-        
-        response = await client.post(
-            "/file/write",
-            json={
-                "repo_path": "test-repo",
-                "file_path": "test.spec.js",
-                "content": "test content",
-                "branch": "feature-branch"
-            }
-        )
-        
-        assert response.status_code == 200
-        
-        # Verify checkout was called
-        mock_run.assert_called_once()
-        args = mock_run.call_args[0][0]
-        assert "checkout" in args
-        assert "feature-branch" in args
+    response = await client.post(
+        "/file/write",
+        json={
+            "repo_path": "test-repo",
+            "file_path": "test.spec.js",
+            "content": "test content",
+            "branch": "feature-branch"
+        }
+    )
+    
+    assert response.status_code == 200
+    
+    # Verify checkout was called
+    git_cmd.assert_called_once()
+    args = git_cmd.call_args[0][0]
+    assert "checkout" in args
+    assert "feature-branch" in args
 
 
 @pytest.mark.asyncio
@@ -194,33 +171,37 @@ async def test_file_write_overwrites_existing_file(client, mock_git_repo):
 
 
 @pytest.mark.asyncio
-async def test_file_write_handles_unicode_content(client, mock_git_repo):
-    """Test file write handles unicode content correctly."""
-    unicode_content = """// Test with Unicode characters
+@pytest.mark.parametrize(
+    "file_path,content",
+    [
+        ("empty.spec.js", ""),
+        ("unicode-test.spec.js", """// Test with Unicode characters
 test('login test 测试', async ({ page }) => {
   await page.goto('https://example.com');
   // Comment with emoji 🎉
   await page.click('#button-日本語');
-});"""
-    
+});"""),
+        ("tests/test-file (1).spec.js", "test content"),
+        ("unix.spec.js", "line1\nline2\nline3"),
+        ("windows.spec.js", "line1\r\nline2\r\nline3"),
+    ],
+    ids=["empty", "unicode", "special-chars-in-path", "unix-line-endings", "windows-line-endings"],
+)
+async def test_file_write_content_roundtrip(client, mock_git_repo, file_path, content):
+    """Test that written content and file names round-trip unchanged."""
     response = await client.post(
         "/file/write",
         json={
             "repo_path": "test-repo",
-            "file_path": "unicode-test.spec.js",
-            "content": unicode_content
+            "file_path": file_path,
+            "content": content
         }
     )
     
     assert response.status_code == 200
     
-    # Verify unicode content is preserved
-    file_path = mock_git_repo / "unicode-test.spec.js"
-    assert file_path.exists()
-    content = file_path.read_text(encoding="utf-8")
-    assert "测试" in content
-    assert "🎉" in content
-    assert "日本語" in content
+    written = mock_git_repo / file_path
+    assert written.read_bytes() == content.encode("utf-8")
 
 
 @pytest.mark.asyncio
@@ -245,45 +226,18 @@ async def test_file_write_prevents_path_traversal(client, mock_git_repo):
         assert "etc/passwd" not in file_path
 
 
-@pytest.mark.asyncio
-async def test_file_write_with_empty_content(client, mock_git_repo):
-    """Test file write with empty content."""
-    response = await client.post(
-        "/file/write",
-        json={
-            "repo_path": "test-repo",
-            "file_path": "empty.spec.js",
-            "content": ""
-        }
-    )
-    
-    assert response.status_code == 200
-    
-    # File should exist but be empty
-    file_path = mock_git_repo / "empty.spec.js"
-    assert file_path.exists()
-    assert file_path.read_text() == ""
-    assert file_path.stat().st_size == 0
-
-
 @pytest.mark.asyncio
 async def test_file_write_with_large_content(client, mock_git_repo):
     """Test file write handles large files."""
-    # Create large content (1MB)
-    large_content = "a" * (1024 * 1024)
-    
     response = await client.post(
         "/file/write",
-        json={
-            "repo_path": "test-repo",
-            "file_path": "large.spec.js",
-            "content": large_content
-        }
+        content=_LARGE_WRITE_BODY,
+        headers={"content-type": "application/json"}
     )
     
     assert response.status_code == 200
     data = response.json()
-    assert data["size_bytes"] == 1024 * 1024
+    assert data["size_bytes"] == LARGE_CONTENT_SIZE
 
 
 @pytest.mark.asyncio
@@ -310,95 +264,75 @@ async def test_file_write_returns_correct_metadata(client, mock_git_repo):
 
 
 @pytest.mark.asyncio
-async def test_file_write_fails_on_checkout_error(client, mock_git_repo):
+async def test_file_write_fails_on_checkout_error(client, mock_git_repo, git_cmd):
     """Test file write fails gracefully when branch checkout fails."""
-    with patch('main.run_git_command') as mock_run:
-        # Simulate checkout failure
-        mock_run.return_value = ("", "Branch not found", 1)
-        
-        response = await client.post(
-            "/file/write",
-            json={
-                "repo_path": "test-repo",
-                "file_path": "test.spec.js",
-                "content": "test content",
-                "branch": "nonexistent-branch"
-            }
-        )
-        
-        assert response.status_code == 500
-        resp_body = response.json()
-        error_msg = resp_body.get("detail") or resp_body.get("message", "")
-        assert "checkout" in error_msg.lower()
-
-
-@pytest.mark.asyncio
-async def test_file_write_with_special_characters_in_path(client, mock_git_repo):
-    """Test file write handles special characters in path."""
+    # Simulate checkout failure
+    git_cmd.return_value = ("", "Branch not found", 1)
+    
     response = await client.post(
         "/file/write",
         json={
             "repo_path": "test-repo",
-            "file_path": "tests/test-file (1).spec.js",
-            "content": "test content"
+            "file_path": "test.spec.js",
+            "content": "test content",
+            "branch": "nonexistent-branch"
         }
     )
     
-    assert response.status_code == 200
-    
-    # Verify file was created with correct name
-    file_path = mock_git_repo / "tests" / "test-file (1).spec.js"
-    assert file_path.exists()
+    assert response.status_code == 500
+    resp_body = response.json()
+    error_msg = resp_body.get("detail") or resp_body.get("message", "")
+    assert "checkout" in error_msg.lower()
 
 
 @pytest.mark.asyncio
-async def test_file_write_preserves_line_endings(client, mock_git_repo):
-    """Test that file write preserves different line endings."""
-    # Content with mixed line endings
-    content_unix = "line1\nline2\nline3"
-    content_windows = "line1\r\nline2\r\nline3"
+async def test_file_write_stream_writes_raw_body(client, mock_git_repo):
+    """Test that the streaming endpoint writes the raw request body to disk."""
+    content = b"line1\r\nline2\n" * 1000
     
-    # Write Unix-style
     response = await client.post(
-        "/file/write",
-        json={
-            "repo_path": "test-repo",
-            "file_path": "unix.spec.js",
-            "content": content_unix
-        }
+        "/file/write-stream",
+        params={"repo_path": "test-repo", "file_path": "stream/big.spec.js"},
+        content=content,
     )
-    assert response.status_code == 200
     
-    # Write Windows-style
-    response = await client.post(
-        "/file/write",
-        json={
-            "repo_path": "test-repo",
-            "file_path": "windows.spec.js",
-            "content": content_windows
-        }
-    )
     assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["size_bytes"] == len(content)
+    assert (mock_git_repo / "stream" / "big.spec.js").read_bytes() == content
+
+
+@pytest.mark.asyncio
+async def test_file_write_stream_interrupted_keeps_existing_file(client, mock_git_repo, monkeypatch):
+    """Test that an upload cut off mid-body leaves the existing file untouched."""
+    target = mock_git_repo / "existing.spec.js"
+    target.write_bytes(b"original content")
     
-    # Verify content is preserved.
-    # On Windows, text-mode write converts \n → \r\n, so content that already
-    # contains \r\n gets double-converted (\r\r\n).  We therefore only assert
-    # that the *logical lines* match – the endpoint preserves line content even
-    # though the OS may normalize line-ending bytes.
-    unix_file = mock_git_repo / "unix.spec.js"
-    windows_file = mock_git_repo / "windows.spec.js"
+    async def interrupted_stream(self):
+        yield b"partial "
+        raise ClientDisconnect()
     
-    # Both files must exist
-    assert unix_file.exists()
-    assert windows_file.exists()
+    monkeypatch.setattr(Request, "stream", interrupted_stream)
     
-    # Unix content roundtrips cleanly on every platform
-    assert unix_file.read_text().splitlines() == content_unix.splitlines()
+    response = await client.post(
+        "/file/write-stream",
+        params={"repo_path": "test-repo", "file_path": "existing.spec.js"},
+        content=b"partial content",
+    )
     
-    # Windows-style \r\n content gets double-converted on Windows because
-    # write_text() translates \n→\r\n, turning \r\n into \r\r\n on disk.
-    # This is a platform limitation, not a bug in the endpoint.
-    # Verify the meaningful text lines match (ignoring empty lines from \r artifacts).
-    win_text_lines = [l for l in windows_file.read_text().splitlines() if l]
-    expected_win_lines = [l for l in content_windows.splitlines() if l]
-    assert win_text_lines == expected_win_lines
+    assert response.status_code == 400
+    assert target.read_bytes() == b"original content"
+    assert not list(mock_git_repo.glob(".existing.spec.js.*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_file_write_stream_prevents_path_traversal(client, mock_git_repo):
+    """Test that the streaming endpoint rejects paths escaping the repo."""
+    response = await client.post(
+        "/file/write-stream",
+        params={"repo_path": "test-repo", "file_path": "../../etc/passwd"},
+        content=b"malicious content",
+    )
+    
+    assert response.status_code == 400
@@ -0,0 +1,23 @@
+"""
+Tests for LLMConnectionsStore class.
+"""
+import os
+import stat
+
+from llm_connections_store import LLMConnectionsStore
+
+
+def test_create_writes_private_record(tmp_path):
+    """Test that connection records (which hold API keys) are created 0600."""
+    store = LLMConnectionsStore(tmp_path / "llm-connections")
+    
+    created = store.create(
+        provider="openai",
+        name="primary",
+        base_url="https://api.openai.com/v1",
+        api_key="sk-test-key-123456",
+    )
+    
+    path = store.base_dir / f"{created.id}.json"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert [c.id for c in store.list()] == [created.id]
@@ -45,9 +45,7 @@ def setup_repo_with_frontend_files(workspace_dir):
     yield conn, workspace_dir / repo_name
 
     try:
-        conn_path = git_main.repo_connections_store._path(conn.id)
-        if conn_path.exists():
-            conn_path.unlink()
+        git_main.repo_connections_store.delete(conn.id)
     except Exception:
         pass
 
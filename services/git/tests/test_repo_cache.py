@@ -0,0 +1,99 @@
+"""
+Tests for RepoMirrorCache (warm bare mirrors used as clone references).
+"""
+import asyncio
+import os
+import shutil
+import subprocess
+import pytest
+from main import run_git_command_async, with_network_config
+from repo_cache import RepoMirrorCache
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """Create a local upstream repository with one commit."""
+    repo = tmp_path / "upstream"
+    repo.mkdir()
+    env = {"GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@t", "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@t"}
+    (repo / "README.md").write_text("hello\n")
+    # subprocess.run is patched suite-wide by _ssh_keygen_patch; check_call is not.
+    for args in (["init", "-q"], ["add", "."], ["commit", "-qm", "init"]):
+        subprocess.check_call(["git", "-C", str(repo)] + args, env={**env, "PATH": "/usr/bin:/bin"})
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_ensure_creates_then_reuses_mirror(tmp_path, upstream):
+    """Test that the first ensure() mirrors the repo and later calls reuse it."""
+    cache = RepoMirrorCache(tmp_path / "mirrors")
+    
+    mirror = await cache.ensure(str(upstream), run_git_command_async)
+    assert mirror is not None
+    assert (mirror / "HEAD").exists()
+    
+    again = await cache.ensure(str(upstream), run_git_command_async)
+    assert again == mirror
+    
+    target = tmp_path / "checkout"
+    _, stderr, code = await run_git_command_async(
+        ["clone", "--reference", str(mirror), "--dissociate", str(upstream), str(target)]
+    )
+    assert code == 0, stderr
+    assert (target / "README.md").read_text() == "hello\n"
+
+
+@pytest.mark.asyncio
+async def test_ensure_returns_none_when_mirror_clone_fails(tmp_path):
+    """Test that an unreachable upstream falls back (no mirror left behind)."""
+    cache = RepoMirrorCache(tmp_path / "mirrors")
+    
+    mirror = await cache.ensure(str(tmp_path / "missing"), run_git_command_async)
+    
+    assert mirror is None
+    assert list(cache.cache_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_all_fetches_with_network_config(tmp_path, upstream):
+    """Test that background refreshes use the same git network settings as ensure()."""
+    cache = RepoMirrorCache(tmp_path / "mirrors")
+    await cache.ensure(str(upstream), run_git_command_async)
+    calls = []
+    
+    async def recording_run_git(args, cwd=None, env=None):
+        calls.append((args, env))
+        return await run_git_command_async(args, cwd=cwd, env=env)
+    
+    await cache.refresh_all(recording_run_git, env=with_network_config())
+    
+    assert [args for args, _ in calls] == [["fetch", "--prune"]]
+    env = calls[0][1]
+    assert env == {**with_network_config(), "GIT_TERMINAL_PROMPT": "0"}
+
+@pytest.mark.asyncio
+async def test_cancelled_git_command_kills_process(tmp_path, monkeypatch):
+    """Test that cancelling run_git_command_async (client disconnect) kills git."""
+    spawned = []
+    create = asyncio.create_subprocess_exec
+    
+    async def tracking_create(*args, **kwargs):
+        proc = await create(*args, **kwargs)
+        spawned.append(proc)
+        return proc
+    
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", tracking_create)
+    
+    # Reading a FIFO with no writer blocks git itself (no child processes)
+    fifo = tmp_path / "fifo"
+    os.mkfifo(fifo)
+    task = asyncio.create_task(run_git_command_async(["hash-object", str(fifo)], cwd=tmp_path))
+    while not spawned:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert spawned[0].returncode is not None
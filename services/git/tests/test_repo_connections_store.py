@@ -0,0 +1,77 @@
+"""
+Tests for RepoConnectionsStore class.
+"""
+import pytest
+from dataclasses import replace
+from fastapi import HTTPException
+from repo_connections_store import RepoConnectionsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Provide a repo connections store backed by a temp directory."""
+    return RepoConnectionsStore(tmp_path / "repo-connections")
+
+
+def _create(store, repo_path="repo"):
+    return store.create(
+        repo_url=f"https://github.com/acme/{repo_path}.git",
+        provider="github",
+        repo_path=repo_path,
+        auth_type="none",
+    )
+
+
+def test_index_reloads_from_disk(store):
+    """Test that a new store instance sees connections persisted by another."""
+    created = _create(store)
+    
+    reloaded = RepoConnectionsStore(store.base_dir)
+    
+    assert reloaded.get(created.id) == created
+    assert [c.id for c in reloaded.list()] == [created.id]
+
+
+def test_update_and_delete_keep_index_in_sync(store):
+    """Test that update/delete are reflected by get/list without rescanning."""
+    created = _create(store)
+    
+    updated = store.update(replace(created, status="synced"))
+    assert store.get(created.id).status == "synced"
+    assert store.list() == [updated]
+    
+    store.delete(created.id)
+    assert store.list() == []
+    with pytest.raises(HTTPException) as exc_info:
+        store.get(created.id)
+    assert exc_info.value.status_code == 404
+
+
+def test_writes_are_atomic_and_private(store):
+    """Test that records are written with 0600 perms and no temp files linger."""
+    import os
+    import platform
+    import stat
+    
+    created = _create(store)
+    store.update(replace(created, status="synced"))
+    
+    files = sorted(p.name for p in store.base_dir.iterdir())
+    assert files == [f"{created.id}.json"]
+    if platform.system() != "Windows":
+        mode = stat.S_IMODE(os.stat(store.base_dir / files[0]).st_mode)
+        assert mode == 0o600
+
+
+def test_load_tolerates_legacy_records(store):
+    """Test that records with missing or unknown keys still load with defaults."""
+    (store.base_dir / "legacy.json").write_text(
+        '{"repo_url": "https://github.com/acme/old.git", "branch": "", "extra": 1}'
+    )
+    
+    conn = RepoConnectionsStore(store.base_dir).get("legacy")
+    
+    assert conn.id == "legacy"
+    assert conn.provider == "unknown"
+    assert conn.status == "connected"
+    assert conn.branch is None
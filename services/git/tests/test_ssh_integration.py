@@ -1,8 +1,10 @@
 """
 Tests for Git operations with SSH key integration.
 """
+import asyncio
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 
 @pytest.mark.asyncio
@@ -17,7 +19,7 @@ async def test_clone_with_ssh_key(client, valid_private_key):
     assert key_response.status_code == 200
     
     # Mock the git clone command
-    with patch("main.run_git_command") as mock_run:
+    with patch("main.run_git_command_async", new_callable=AsyncMock) as mock_run:
         mock_run.return_value = ("Cloned successfully", "", 0)
         
         # Clone repository with SSH key
@@ -31,6 +33,7 @@ async def test_clone_with_ssh_key(client, valid_private_key):
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
+        assert "test_clone_key" in mock_run.call_args.kwargs["env"]["GIT_SSH_COMMAND"]
 
 
 @pytest.mark.asyncio
@@ -117,7 +120,7 @@ async def test_pull_with_ssh_key(client, valid_private_key, workspace_dir):
 async def test_clone_without_ssh_key(client):
     """Test cloning repository without SSH key (HTTPS)."""
     # Mock the git clone command
-    with patch("main.run_git_command") as mock_run:
+    with patch("main.run_git_command_async", new_callable=AsyncMock) as mock_run:
         mock_run.return_value = ("Cloned successfully", "", 0)
         
         # Clone repository without SSH key
@@ -136,7 +139,7 @@ async def test_clone_without_ssh_key(client):
 async def test_ssh_url_validation(client):
     """Test that SSH URLs are accepted by validator."""
     # Mock the git clone command
-    with patch("main.run_git_command") as mock_run:
+    with patch("main.run_git_command_async", new_callable=AsyncMock) as mock_run:
         mock_run.return_value = ("Cloned successfully", "", 0)
         
         # Test various SSH URL formats
@@ -146,13 +149,11 @@ async def test_ssh_url_validation(client):
             "git@bitbucket.org:user/repo.git"
         ]
         
-        for ssh_url in ssh_urls:
-            clone_payload = {
-                "repo_url": ssh_url
-            }
-            
-            response = await client.post("/clone", json=clone_payload)
-            
+        responses = await asyncio.gather(
+            *[client.post("/clone", json={"repo_url": ssh_url}) for ssh_url in ssh_urls]
+        )
+        
+        for ssh_url, response in zip(ssh_urls, responses):
             # Should succeed (validation passes, mocked git command succeeds)
             assert response.status_code == 200, f"Failed for URL: {ssh_url}"
 
@@ -167,13 +168,11 @@ async def test_invalid_protocol_rejected(client):
         "http://example.com/repo"  # http (not https) should be rejected
     ]
     
-    for invalid_url in invalid_urls:
-        clone_payload = {
-            "repo_url": invalid_url
-        }
-        
-        response = await client.post("/clone", json=clone_payload)
-        
+    responses = await asyncio.gather(
+        *[client.post("/clone", json={"repo_url": invalid_url}) for invalid_url in invalid_urls]
+    )
+    
+    for invalid_url, response in zip(invalid_urls, responses):
         # Should fail validation
         assert response.status_code == 400, f"Should reject URL: {invalid_url}"
         data = response.json()
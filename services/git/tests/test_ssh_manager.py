@@ -74,6 +74,15 @@ def test_add_key_invalid_name(ssh_manager, valid_private_key):
     assert "alphanumeric" in str(exc_info.value.detail).lower()
 
 
+@pytest.mark.parametrize("key_name", ["", "ключ", "key.name", "key name", "key\n"])
+def test_add_key_rejects_non_ascii_or_punctuated_names(ssh_manager, valid_private_key, key_name):
+    """Test that key names are limited to ASCII alphanumerics, '_' and '-'."""
+    with pytest.raises(HTTPException) as exc_info:
+        ssh_manager.add_key(key_name, valid_private_key)
+    
+    assert exc_info.value.status_code == 400
+
+
 def test_add_key_invalid_format(ssh_manager):
     """Test adding key with invalid format."""
     with pytest.raises(HTTPException) as exc_info:
@@ -83,6 +92,19 @@ def test_add_key_invalid_format(ssh_manager):
     assert "invalid private key format" in str(exc_info.value.detail).lower()
 
 
+def test_add_key_rejected_key_never_written(ssh_manager, valid_private_key, ssh_keys_dir, mock_ssh_keygen):
+    """Test that a key rejected by ssh-keygen is validated from stdin and never stored."""
+    mock_ssh_keygen.return_value.returncode = 1
+    mock_ssh_keygen.return_value.stderr = "invalid format"
+    
+    with pytest.raises(HTTPException) as exc_info:
+        ssh_manager.add_key("bad_key", valid_private_key)
+    
+    assert exc_info.value.status_code == 400
+    assert not (ssh_keys_dir / "bad_key").exists()
+    assert mock_ssh_keygen.call_args.kwargs["input"] == valid_private_key + "\n"
+
+
 def test_add_key_duplicate(ssh_manager, valid_private_key):
     """Test adding duplicate key."""
     # Add first key
@@ -219,6 +241,30 @@ def test_get_ssh_command_args_key_not_found(ssh_manager):
     assert "not found" in str(exc_info.value.detail)
 
 
+def test_get_ssh_command_args_after_delete(ssh_manager, valid_private_key):
+    """Test that SSH args are not served for a deleted key."""
+    ssh_manager.add_key("deleted_key", valid_private_key)
+    assert "-i" in ssh_manager.get_ssh_command_args("deleted_key")
+    
+    ssh_manager.delete_key("deleted_key")
+    
+    with pytest.raises(HTTPException) as exc_info:
+        ssh_manager.get_ssh_command_args("deleted_key")
+    assert exc_info.value.status_code == 404
+
+
+def test_get_ssh_command_args_key_file_removed_externally(ssh_manager, valid_private_key):
+    """Test that a key file deleted outside delete_key() is reported as not found."""
+    ssh_manager.add_key("removed_key", valid_private_key)
+    assert "-i" in ssh_manager.get_ssh_command_args("removed_key")
+    
+    (ssh_manager.keys_dir / "removed_key").unlink()
+    
+    with pytest.raises(HTTPException) as exc_info:
+        ssh_manager.get_ssh_command_args("removed_key")
+    assert exc_info.value.status_code == 404
+
+
 def test_configure_git_ssh_no_key(ssh_manager):
     """Test configuring Git SSH without specific key."""
     result = ssh_manager.configure_git_ssh()
@@ -226,7 +272,7 @@ def test_configure_git_ssh_no_key(ssh_manager):
     assert result["configured"] is True
     assert "ssh_command" in result
     assert result["key_used"] is None
-    assert "GIT_SSH_COMMAND" in os.environ
+    assert result["env"] == {"GIT_SSH_COMMAND": result["ssh_command"]}
 
 
 def test_configure_git_ssh_with_key(ssh_manager, valid_private_key):
@@ -240,5 +286,28 @@ def test_configure_git_ssh_with_key(ssh_manager, valid_private_key):
     assert result["key_used"] == "test_key"
     assert "-i" in result["ssh_command"]
     assert "test_key" in result["ssh_command"]
-    assert "GIT_SSH_COMMAND" in os.environ
-    assert "test_key" in os.environ["GIT_SSH_COMMAND"]
+    assert "test_key" in result["env"]["GIT_SSH_COMMAND"]
+    assert "test_key" not in os.environ.get("GIT_SSH_COMMAND", "")
+
+
+def test_list_keys_caches_fingerprints(ssh_manager, valid_private_key, mock_ssh_keygen):
+    """Test that repeat listings reuse fingerprints for unchanged key files."""
+    ssh_manager.add_key("cached_key", valid_private_key)
+    mock_ssh_keygen.reset_mock()
+    
+    first = ssh_manager.list_keys()
+    second = ssh_manager.list_keys()
+    
+    assert first == second
+    assert mock_ssh_keygen.call_count == 1
+
+
+def test_delete_key_evicts_cached_fingerprint(ssh_manager, valid_private_key):
+    """Test that deleting a key drops its cached fingerprint."""
+    ssh_manager.add_key("evict_me", valid_private_key)
+    ssh_manager.list_keys()
+    assert str(ssh_manager.keys_dir / "evict_me") in ssh_manager._fingerprint_cache
+    
+    ssh_manager.delete_key("evict_me")
+    
+    assert str(ssh_manager.keys_dir / "evict_me") not in ssh_manager._fingerprint_cache
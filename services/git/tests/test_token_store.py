@@ -0,0 +1,84 @@
+"""
+Tests for APITokenStore class.
+"""
+import json
+import os
+import stat
+
+import pytest
+from fastapi import HTTPException
+from token_store import APITokenStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Provide an API token store backed by a temp directory."""
+    return APITokenStore(tmp_path / "api-tokens")
+
+
+def test_list_reads_index_only(store):
+    """Test that list() is served from index.json and picks up create/delete."""
+    first = store.create(provider="github", name="one", token="ghp_first_token_123")
+    second = store.create(provider="gitlab", name="two", token="glpat_second_token_456")
+    
+    # Secrets are not needed to list
+    (store.base_dir / f"{first.id}.secret").unlink()
+    assert {t.id for t in store.list()} == {first.id, second.id}
+    
+    store.delete(second.id)
+    assert [t.id for t in store.list()] == [first.id]
+    assert not (store.base_dir / f"{second.id}.secret").exists()
+
+
+def test_secret_files_are_private_and_not_indexed(store):
+    """Test that token values live only in 0600 .secret files."""
+    created = store.create(provider="github", name="ci", token="ghp_secret_value_789")
+    
+    secret = store.base_dir / f"{created.id}.secret"
+    assert stat.S_IMODE(os.stat(secret).st_mode) == 0o600
+    assert "ghp_secret_value_789" not in store.index_path.read_text()
+    assert store.get_token_value(created.id) == "ghp_secret_value_789"
+    assert store.get_raw(created.id)["provider"] == "github"
+
+
+def test_legacy_records_are_migrated(tmp_path):
+    """Test that one-JSON-per-token records are folded into the index layout."""
+    base = tmp_path / "api-tokens"
+    base.mkdir()
+    (base / "legacy1.json").write_text(json.dumps({
+        "id": "legacy1",
+        "provider": "github",
+        "name": "old",
+        "token": "ghp_legacy_token_000",
+        "created_at": "2024-01-01T00:00:00+00:00",
+    }))
+    
+    store = APITokenStore(base)
+    
+    assert [t.id for t in store.list()] == ["legacy1"]
+    assert store.get_token_value("legacy1") == "ghp_legacy_token_000"
+    assert not (base / "legacy1.json").exists()
+
+
+def test_get_metadata_omits_secret(store):
+    """Test that get_metadata() returns index data without reading the secret."""
+    created = store.create(provider="gitlab", name="bot", token="glpat_meta_token_321")
+    (store.base_dir / f"{created.id}.secret").unlink()
+    
+    meta = store.get_metadata(created.id)
+    
+    assert meta["provider"] == "gitlab"
+    assert "token" not in meta
+
+
+def test_corrupt_index_is_not_overwritten(store):
+    """Test that an unreadable index.json fails loudly instead of being replaced."""
+    existing = store.create(provider="github", name="keep", token="ghp_keep_token_123")
+    store.index_path.write_bytes(b"{not json")
+    
+    with pytest.raises(HTTPException) as exc_info:
+        store.create(provider="github", name="new", token="ghp_new_token_456")
+    
+    assert exc_info.value.status_code == 500
+    assert store.index_path.read_bytes() == b"{not json"
+    assert [p.name for p in store.base_dir.glob("*.secret")] == [f"{existing.id}.secret"]
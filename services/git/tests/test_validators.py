@@ -0,0 +1,154 @@
+"""
+Tests for Git service input validators.
+"""
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from validators import (
+    sanitize_path,
+    validate_branch_name,
+    validate_commit_message,
+    validate_file_list,
+    validate_repo_url,
+)
+
+
+@pytest.mark.parametrize(
+    "path,pattern",
+    [
+        ("../etc", r"\.\."),
+        ("~/x", "~"),
+        ("a$b", r"\$"),
+        ("a`b", "`"),
+        ("a|b", r"\|"),
+        ("a;b", ";"),
+        ("a&b", "&"),
+        ("a\nb", r"\n"),
+        ("a\rb", r"\r"),
+        # Several matches: the first pattern in DANGEROUS_PATH_PATTERNS order is reported
+        ("a;b/../c", r"\.\."),
+    ],
+)
+def test_sanitize_path_rejects_dangerous_sequences(tmp_path, path, pattern):
+    """Test that every dangerous path sequence is rejected, naming the matched pattern."""
+    with pytest.raises(HTTPException) as exc_info:
+        sanitize_path(path, tmp_path)
+    
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == f"Path contains invalid characters or sequences: {pattern}"
+
+
+def test_sanitize_path_accepts_nested_relative_path(tmp_path):
+    """Test that a plain relative path resolves inside the base directory."""
+    assert sanitize_path("tests/login.spec.ts", tmp_path) == (tmp_path / "tests" / "login.spec.ts").resolve()
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        ("fix\0bug", "null bytes"),
+        ("fix\x1bbug", "control character"),
+        ("fix\ud800bug", "valid UTF-8"),
+        # Null bytes, then encoding, take priority over an earlier control character
+        ("a\x01b\0", "null bytes"),
+        ("a\x01b\ud800", "valid UTF-8"),
+    ],
+    ids=["null-byte", "escape", "lone-surrogate", "null-byte-priority", "surrogate-priority"],
+)
+def test_validate_commit_message_rejects_invalid_characters(message, expected):
+    """Test that control characters and unencodable text are rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        validate_commit_message(message)
+    
+    assert exc_info.value.status_code == 400
+    assert expected in exc_info.value.detail
+
+
+def test_validate_commit_message_allows_whitespace_and_unicode():
+    """Test that tabs, line breaks and non-ASCII text are accepted unchanged."""
+    message = "Add tests 🎉\r\n\n\t- login flow"
+    assert validate_commit_message(message) == message
+
+
+@pytest.mark.parametrize(
+    "branch,expected",
+    [
+        ("-delete", "cannot start with '-'"),
+        ("feature..x", "invalid sequence: .."),
+        ("feature//x", "invalid sequence: //"),
+        ("feature@{1}", "invalid sequence: @{"),
+        ("main\n", "invalid characters"),
+        ("has space", "invalid characters"),
+        ("HEAD", "Reserved branch name"),
+        ("topic.lock", "cannot end with '.lock'"),
+    ],
+)
+def test_validate_branch_name_rejects_invalid_names(branch, expected):
+    """Test that each branch name rule reports its own error."""
+    with pytest.raises(HTTPException) as exc_info:
+        validate_branch_name(branch)
+    
+    assert exc_info.value.status_code == 400
+    assert expected in exc_info.value.detail
+
+
+@pytest.mark.parametrize("branch", ["main", "feature/login-page", "release_1.2.3"])
+def test_validate_branch_name_accepts_valid_names(branch):
+    """Test that ordinary branch names pass unchanged."""
+    assert validate_branch_name(branch) == branch
+
+
+def test_validate_file_list_returns_paths_relative_to_base(tmp_path):
+    """Test that validated files come back relative to the repository."""
+    files = ["README.md", "tests/login.spec.ts", "tests/./nested/a.spec.ts"]
+    
+    assert validate_file_list(files, tmp_path) == [
+        "README.md",
+        str(Path("tests") / "login.spec.ts"),
+        str(Path("tests") / "nested" / "a.spec.ts"),
+    ]
+
+
+def test_validate_file_list_rejects_symlink_escape(tmp_path):
+    """Test that a symlink resolving outside the base is rejected."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (tmp_path / "repo-other").mkdir()
+    (repo / "link").symlink_to(tmp_path / "repo-other")
+    
+    with pytest.raises(HTTPException) as exc_info:
+        validate_file_list(["link/secret.txt"], repo)
+    
+    assert "Path traversal detected" in exc_info.value.detail
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("http://github.com/acme/repo.git", "protocols are allowed"),
+        ("file:///etc/passwd", "protocols are allowed"),
+        ("https://github.com/acme/repo.git;rm -rf /", "invalid character: ;"),
+        ("https://github.com/acme/$(id).git", "invalid character: $"),
+        ("git@github.com:acme/repo.git\n", "invalid character"),
+        # Several bad characters: the first in DANGEROUS_URL_CHARS order is reported
+        ("https://github.com/acme/x;`.git", "invalid character: `"),
+    ],
+)
+def test_validate_repo_url_rejects_invalid_urls(url, expected):
+    """Test that unsupported protocols and shell metacharacters are rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        validate_repo_url(url)
+    
+    assert exc_info.value.status_code == 400
+    assert expected in exc_info.value.detail
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["https://github.com/acme/repo.git", "git://example.com/repo.git", "git@github.com:acme/repo.git"],
+)
+def test_validate_repo_url_accepts_supported_protocols(url):
+    """Test that https, git and SSH URLs pass unchanged."""
+    assert validate_repo_url(url) == url
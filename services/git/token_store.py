@@ -8,19 +8,23 @@ Note: This is not encryption; it relies on container/volume access control.
 
 from __future__ import annotations
 
-import json
 import os
 import stat
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Literal, Optional
 from uuid import uuid4
 
+import orjson
 from fastapi import HTTPException
 
 Provider = Literal["github", "gitlab", "azureDevOps"]
 
+# POSIX permission bits are meaningless on Windows; skip the chmod there.
+_CAN_CHMOD = os.name != "nt"
+
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -46,40 +50,122 @@ class StoredToken:
 
 
 class APITokenStore:
-    """File-backed API token store."""
+    """File-backed API token store.
+
+    Layout: `index.json` holds metadata for every token (masked value only) so
+    listing is one read regardless of token count; each secret lives in its
+    own `{id}.secret` file (0o600). Legacy one-`{id}.json`-per-token records
+    are folded into this layout on startup.
+    """
 
     def __init__(self, base_dir: Path):
         self.base_dir = base_dir
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        if _CAN_CHMOD:
+            try:
+                os.chmod(self.base_dir, 0o700)
+            except Exception:
+                # Best-effort (some FS/mounts may not support chmod semantics).
+                pass
+        self.index_path = self.base_dir / "index.json"
+        self._lock = threading.Lock()
+        # Parsed index keyed by the index file's (st_ino, st_mtime_ns, st_size)
+        self._cache: Optional[tuple[tuple[int, int, int], list[dict]]] = None
+        self._migrate_legacy()
+
+    def _secret_path(self, token_id: str) -> Path:
+        return self.base_dir / f"{token_id}.secret"
+
+    def _write_private(self, path: Path, data: bytes) -> None:
+        """Atomically replace `path` with `data` (0o600)."""
+        tmp = path.with_name(path.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.S_IRUSR | stat.S_IWUSR)
         try:
-            os.chmod(self.base_dir, 0o700)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            os.replace(tmp, path)
         except Exception:
-            # Best-effort (some FS/mounts may not support chmod semantics).
-            pass
+            tmp.unlink(missing_ok=True)
+            raise
 
-    def _token_path(self, token_id: str) -> Path:
-        return self.base_dir / f"{token_id}.json"
+    def _read_index(self) -> list[dict]:
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            return []
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._cache
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            raw = orjson.loads(self.index_path.read_bytes())
+            if not isinstance(raw, list):
+                raise ValueError("expected a JSON list")
+        except Exception as e:
+            # Never treat an unreadable index as empty: the next write would
+            # drop every token's metadata and orphan their secret files.
+            raise HTTPException(status_code=500, detail=f"Failed to read token index: {str(e)}")
+        entries = [e for e in raw if isinstance(e, dict)]
+        self._cache = (stamp, entries)
+        return entries
+
+    def _write_index(self, entries: list[dict]) -> None:
+        self._cache = None
+        # Compact: the index is rewritten on every create/delete
+        self._write_private(self.index_path, orjson.dumps(entries))
+
+    def _migrate_legacy(self) -> None:
+        with os.scandir(self.base_dir) as it:
+            legacy = [
+                Path(entry.path)
+                for entry in it
+                if entry.name.endswith(".json")
+                and entry.name != self.index_path.name
+                and entry.is_file(follow_symlinks=False)
+            ]
+        if not legacy:
+            return
+        with self._lock:
+            entries = list(self._read_index())
+            known = {e.get("id") for e in entries}
+            for file in legacy:
+                try:
+                    raw = orjson.loads(file.read_bytes())
+                    token_id = str(raw.get("id") or file.stem)
+                    token_value = str(raw.get("token", "")).strip()
+                    if token_id not in known:
+                        self._write_private(self._secret_path(token_id), token_value.encode("utf-8"))
+                        entries.append({
+                            "id": token_id,
+                            "provider": raw.get("provider"),
+                            "name": str(raw.get("name", "")).strip(),
+                            "created_at": str(raw.get("created_at", "")) or "",
+                            "azure_org": raw.get("azure_org") or None,
+                            "token_masked": _mask_token(token_value),
+                        })
+                        known.add(token_id)
+                except Exception:
+                    # Leave malformed legacy files in place for manual inspection.
+                    continue
+                self._write_index(entries)
+                file.unlink(missing_ok=True)
 
     def list(self) -> list[StoredToken]:
-        tokens: list[StoredToken] = []
-        for file in self.base_dir.glob("*.json"):
-            try:
-                raw = json.loads(file.read_text(encoding="utf-8"))
-                token_value = str(raw.get("token", ""))
-                tokens.append(
-                    StoredToken(
-                        id=str(raw.get("id") or file.stem),
-                        provider=raw.get("provider"),
-                        name=str(raw.get("name", "")).strip(),
-                        created_at=str(raw.get("created_at", "")) or "",
-                        token_masked=_mask_token(token_value),
-                        azure_org=(raw.get("azure_org") or None),
-                    )
-                )
-            except Exception:
-                # Skip malformed entries.
-                continue
-
+        tokens = [
+            StoredToken(
+                id=str(e.get("id", "")),
+                provider=e.get("provider"),
+                name=str(e.get("name", "")),
+                created_at=str(e.get("created_at", "")) or "",
+                token_masked=str(e.get("token_masked", "")),
+                azure_org=e.get("azure_org") or None,
+            )
+            for e in self._read_index()
+        ]
         # Newest first
         tokens.sort(key=lambda t: t.created_at or "", reverse=True)
         return tokens
@@ -92,60 +178,62 @@ class APITokenStore:
         if not token:
             raise HTTPException(status_code=400, detail="Token value is required")
 
-        token_id = uuid4().hex
-        created_at = now_iso()
-
-        payload = {
-            "id": token_id,
-            "provider": provider,
-            "name": name,
-            "token": token,
-            "created_at": created_at,
-            "azure_org": azure_org,
-        }
-
-        path = self._token_path(token_id)
-        try:
-            path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)  # 0o600
-        except Exception as e:
-            if path.exists():
-                try:
-                    path.unlink()
-                except Exception:
-                    pass
-            raise HTTPException(status_code=500, detail=f"Failed to store token: {str(e)}")
-
-        return StoredToken(
-            id=token_id,
+        stored = StoredToken(
+            id=uuid4().hex,
             provider=provider,
             name=name,
-            created_at=created_at,
+            created_at=now_iso(),
             token_masked=_mask_token(token),
             azure_org=azure_org,
         )
 
+        secret_path = self._secret_path(stored.id)
+        with self._lock:
+            entries = self._read_index()
+            try:
+                self._write_private(secret_path, token.encode("utf-8"))
+                self._write_index([*entries, stored.__dict__])
+            except Exception as e:
+                secret_path.unlink(missing_ok=True)
+                raise HTTPException(status_code=500, detail=f"Failed to store token: {str(e)}")
+
+        return stored
+
     def delete(self, token_id: str) -> None:
-        path = self._token_path(token_id)
-        if not path.exists():
+        with self._lock:
+            entries = self._read_index()
+            remaining = [e for e in entries if e.get("id") != token_id]
+            if len(remaining) == len(entries):
+                raise HTTPException(status_code=404, detail="Token not found")
+            try:
+                self._write_index(remaining)
+                self._secret_path(token_id).unlink(missing_ok=True)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Failed to delete token: {str(e)}")
+
+    def get_metadata(self, token_id: str) -> dict:
+        """Return the stored metadata for a token (no secret; served from the index)."""
+        entry = next((e for e in self._read_index() if e.get("id") == token_id), None)
+        if entry is None:
             raise HTTPException(status_code=404, detail="Token not found")
-        try:
-            path.unlink()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to delete token: {str(e)}")
+        return {k: v for k, v in entry.items() if k != "token_masked"}
 
     def get_raw(self, token_id: str) -> dict:
-        path = self._token_path(token_id)
-        if not path.exists():
-            raise HTTPException(status_code=404, detail="Token not found")
+        raw = self.get_metadata(token_id)
+        raw["token"] = self._read_secret(token_id)
+        return raw
+
+    def _read_secret(self, token_id: str) -> str:
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
+            return self._secret_path(token_id).read_bytes().decode("utf-8")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Token not found")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to read token: {str(e)}")
 
     def get_token_value(self, token_id: str) -> str:
-        raw = self.get_raw(token_id)
-        token_value = str(raw.get("token", "")).strip()
+        self.get_metadata(token_id)  # 404 for unknown ids; never read arbitrary paths
+        token_value = self._read_secret(token_id).strip()
         if not token_value:
             raise HTTPException(status_code=500, detail="Stored token is empty")
         return token_value
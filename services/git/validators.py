@@ -2,6 +2,7 @@
 Input validation and sanitization for Git service.
 Prevents path traversal, command injection, and other security issues.
 """
+import os
 import re
 from pathlib import Path
 from typing import Optional
@@ -20,14 +21,29 @@ DANGEROUS_PATH_PATTERNS = [
     r'\n',    # Newline injection
     r'\r',    # Carriage return injection
 ]
+# All of the above in one pattern: a single scan per path instead of one per pattern
+DANGEROUS_PATH_RE = re.compile('|'.join(DANGEROUS_PATH_PATTERNS))
 
-VALID_BRANCH_PATTERN = re.compile(r'^[a-zA-Z0-9/_.-]+$')
 INVALID_BRANCH_SEQUENCES = [
     '..',     # Parent reference
     '//',     # Double slash
     '@{',     # Special git ref
     '~',      # Tilde expansion
 ]
+RESERVED_BRANCH_NAMES = frozenset({'.', '@', 'HEAD'})
+# Fused check for the rules above: allowed characters, no leading '-', no
+# '..' or '//' ('@{' and '~' are already outside the character set)
+BRANCH_NAME_PATTERN = re.compile(r'(?!-)(?!.*(?:\.\.|//))[a-zA-Z0-9/_.-]+')
+
+# Characters rejected in commit messages: control characters other than
+# tab/newline/carriage return, and lone surrogates (not encodable as UTF-8)
+INVALID_COMMIT_CHAR_PATTERN = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff]')
+
+ALLOWED_REPO_URL_PREFIXES = ('https://', 'git://', 'git@')
+# Shell metacharacters rejected in repository URLs, in the order errors report them
+DANGEROUS_URL_CHARS = ['`', '$', ';', '&', '|', '\n', '\r']
+# All of the above in one pattern: a single scan per URL instead of one per character
+DANGEROUS_URL_CHAR_PATTERN = re.compile(r'[`$;&|\n\r]')
 
 # Maximum lengths to prevent DoS
 MAX_COMMIT_MESSAGE_LENGTH = 10000
@@ -49,6 +65,17 @@ def sanitize_path(path_str: str, base_path: Path) -> Path:
     Raises:
         HTTPException: If path is invalid or attempts traversal
     """
+    base_str = str(base_path)
+    return Path(_resolve_within(path_str, base_str, os.path.join(base_str, '')))
+
+
+def _resolve_within(path_str: str, base_str: str, base_prefix: str) -> str:
+    """
+    sanitize_path() on plain strings: returns the resolved absolute path.
+    
+    base_prefix is base_str with a trailing separator, precomputed so callers
+    validating many paths against one base build it once.
+    """
     if not path_str:
         raise HTTPException(status_code=400, detail="Path cannot be empty")
     
@@ -59,46 +86,39 @@ def sanitize_path(path_str: str, base_path: Path) -> Path:
         )
     
     # Check for dangerous patterns
-    for pattern in DANGEROUS_PATH_PATTERNS:
-        if re.search(pattern, path_str):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Path contains invalid characters or sequences: {pattern}"
-            )
+    if DANGEROUS_PATH_RE.search(path_str):
+        # Report the first offending pattern in list order, as the per-pattern checks did
+        pattern = next(p for p in DANGEROUS_PATH_PATTERNS if re.search(p, path_str))
+        raise HTTPException(
+            status_code=400,
+            detail=f"Path contains invalid characters or sequences: {pattern}"
+        )
+    
+    # If it's absolute, reject it (should be relative to base)
+    if os.path.isabs(path_str):
+        raise HTTPException(
+            status_code=400,
+            detail="Absolute paths are not allowed"
+        )
     
-    # Resolve the path
+    # Resolve the full path (symlinks included)
     try:
-        # Convert to Path and resolve to absolute path
-        user_path = Path(path_str)
-        
-        # If it's absolute, reject it (should be relative to base)
-        if user_path.is_absolute():
-            raise HTTPException(
-                status_code=400,
-                detail="Absolute paths are not allowed"
-            )
-        
-        # Resolve the full path
-        full_path = (base_path / user_path).resolve()
-        
-        # Ensure the resolved path is still within base_path
-        try:
-            full_path.relative_to(base_path)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail="Path traversal detected: path escapes workspace directory"
-            )
-        
-        return full_path
-        
+        full_str = os.path.realpath(os.path.join(base_str, path_str))
     except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
         raise HTTPException(
             status_code=400,
             detail=f"Invalid path: {str(e)}"
         )
+    
+    # Ensure the resolved path is still within base_path (string prefix
+    # check; base_prefix ends in a separator so /ws2 doesn't match /ws)
+    if not full_str.startswith(base_prefix) and full_str != base_str:
+        raise HTTPException(
+            status_code=400,
+            detail="Path traversal detected: path escapes workspace directory"
+        )
+    
+    return full_str
 
 
 def validate_branch_name(branch_name: str) -> str:
@@ -129,30 +149,32 @@ def validate_branch_name(branch_name: str) -> str:
             detail=f"Branch name too long (max {MAX_BRANCH_NAME_LENGTH} characters)"
         )
     
-    # Check if starts with dash (would be interpreted as flag)
-    if branch_name.startswith('-'):
-        raise HTTPException(
-            status_code=400,
-            detail="Branch name cannot start with '-'"
-        )
-    
-    # Check for invalid sequences
-    for seq in INVALID_BRANCH_SEQUENCES:
-        if seq in branch_name:
+    # One scan decides validity; the individual checks below only run to
+    # report which rule a rejected name broke
+    if not BRANCH_NAME_PATTERN.fullmatch(branch_name):
+        # Check if starts with dash (would be interpreted as flag)
+        if branch_name.startswith('-'):
             raise HTTPException(
                 status_code=400,
-                detail=f"Branch name contains invalid sequence: {seq}"
+                detail="Branch name cannot start with '-'"
             )
-    
-    # Check against allowed pattern
-    if not VALID_BRANCH_PATTERN.match(branch_name):
+        
+        # Check for invalid sequences
+        for seq in INVALID_BRANCH_SEQUENCES:
+            if seq in branch_name:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Branch name contains invalid sequence: {seq}"
+                )
+        
+        # Otherwise a character is outside the allowed set
         raise HTTPException(
             status_code=400,
             detail="Branch name contains invalid characters (allowed: a-z, A-Z, 0-9, /, _, -, .)"
         )
     
     # Additional checks
-    if branch_name in ['.', '@', 'HEAD']:
+    if branch_name in RESERVED_BRANCH_NAMES:
         raise HTTPException(
             status_code=400,
             detail=f"Reserved branch name: {branch_name}"
@@ -189,29 +211,19 @@ def validate_commit_message(message: str) -> str:
             detail=f"Commit message too long (max {MAX_COMMIT_MESSAGE_LENGTH} characters)"
         )
     
-    # Check for null bytes (can cause issues with git)
-    if '\0' in message:
-        raise HTTPException(
-            status_code=400,
-            detail="Commit message cannot contain null bytes"
-        )
-    
-    # Ensure it's valid UTF-8
-    try:
-        message.encode('utf-8')
-    except UnicodeEncodeError:
-        raise HTTPException(
-            status_code=400,
-            detail="Commit message must be valid UTF-8"
-        )
-    
-    # Check for control characters (except newlines and tabs)
-    for char in message:
-        if ord(char) < 32 and char not in ['\n', '\t', '\r']:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Commit message contains invalid control character: {repr(char)}"
-            )
+    # One scan for null bytes, other control characters (except newlines
+    # and tabs) and lone surrogates
+    match = INVALID_COMMIT_CHAR_PATTERN.search(message)
+    if match:
+        # Same priority as the separate checks: null bytes, then encoding,
+        # then the first control character
+        if '\0' in message:
+            detail = "Commit message cannot contain null bytes"
+        elif re.search('[\ud800-\udfff]', message):
+            detail = "Commit message must be valid UTF-8"
+        else:
+            detail = f"Commit message contains invalid control character: {match.group(0)!r}"
+        raise HTTPException(status_code=400, detail=detail)
     
     return message
 
@@ -239,14 +251,18 @@ def validate_file_list(files: list[str], base_path: Path) -> list[str]:
             detail="Too many files (max 1000 per request)"
         )
     
+    # Resolve the base once for the whole list; per file, work on plain
+    # strings rather than building Path objects
+    base_str = os.path.realpath(base_path)
+    base_prefix = os.path.join(base_str, '')
+    
     validated_files = []
     for file_path in files:
         # Sanitize each path
-        full_path = sanitize_path(file_path, base_path)
+        full_str = _resolve_within(file_path, base_str, base_prefix)
         
         # Store relative path for git command
-        relative_path = full_path.relative_to(base_path)
-        validated_files.append(str(relative_path))
+        validated_files.append(full_str[len(base_prefix):] or '.')
     
     return validated_files
 
@@ -274,24 +290,20 @@ def validate_repo_url(repo_url: str) -> str:
         )
     
     # Allow https://, git://, and SSH URLs (git@...)
-    is_https = repo_url.startswith('https://')
-    is_git = repo_url.startswith('git://')
-    is_ssh = repo_url.startswith('git@')
-    
-    if not (is_https or is_git or is_ssh):
+    if not repo_url.startswith(ALLOWED_REPO_URL_PREFIXES):
         raise HTTPException(
             status_code=400,
             detail="Only https://, git://, and SSH (git@...) protocols are allowed"
         )
     
     # Check for dangerous characters (excluding @ and : which are valid in SSH URLs)
-    dangerous_chars = ['`', '$', ';', '&', '|', '\n', '\r']
-    for char in dangerous_chars:
-        if char in repo_url:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Repository URL contains invalid character: {char}"
-            )
+    if DANGEROUS_URL_CHAR_PATTERN.search(repo_url):
+        # Report the first offending character in list order, as the per-character checks did
+        char = next(c for c in DANGEROUS_URL_CHARS if c in repo_url)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Repository URL contains invalid character: {char}"
+        )
     
     return repo_url
 
@@ -1,8 +1,12 @@
+import re
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
 from shared.db import get_db, close_client
 from shared.models import ReleaseCreate, ReleaseUpdate, ReleaseOut
 from shared.errors import setup_all_error_handlers
@@ -29,6 +33,8 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(
     lifespan=lifespan,
+    # orjson encodes the list responses (up to 200 releases) faster than stdlib json
+    default_response_class=ORJSONResponse,
     title="Releases Management Service",
     version="1.0.0",
     description="""Service for managing releases and organizing requirements/testcases by release.
@@ -68,18 +74,51 @@ app.add_middleware(
 )
 
 COL = "releases"
+OBJECT_ID_PATTERN = re.compile(r"[0-9a-fA-F]{24}")
+
+# MongoDB error code for "text index required for $text query"
+INDEX_NOT_FOUND = 27
+
+# A search term matches only where it isn't directly preceded or followed by
+# one of these: ASCII letters/digits/underscore and any non-ASCII character
+# (MongoDB PCRE syntax)
+SEARCH_WORD_CHAR = r"[0-9A-Za-z_\x{80}-\x{10FFFF}]"
+
+
+def search_filter(q: str) -> dict:
+    """Filter for releases whose name or description contains q as a whole-word phrase.
+
+    The regex decides what matches. When q contains a word (and no double
+    quote), the same phrase is also sent as a `$text` search so
+    releases_text_idx narrows the candidates instead of a collection scan;
+    every regex match contains the phrase's words, so this never drops one.
+    """
+    pattern = f"(?<!{SEARCH_WORD_CHAR}){re.escape(q)}(?!{SEARCH_WORD_CHAR})"
+    filt = {"$or": [{"name": {"$regex": pattern, "$options": "i"}}, {"description": {"$regex": pattern, "$options": "i"}}]}
+    if '"' not in q and any(c.isalnum() for c in q):
+        filt["$text"] = {"$search": f'"{q}"'}
+    return filt
 
 def oid(id_: str) -> ObjectId:
-    try:
-        return ObjectId(id_)
-    except Exception:
+    # Plain branch for bad ids; ObjectId() can't fail on 24 hex digits
+    if not OBJECT_ID_PATTERN.fullmatch(id_):
         raise HTTPException(status_code=400, detail="Invalid id")
+    return ObjectId(id_)
 
 def now():
     return datetime.now(timezone.utc)
 
+def as_stored(value: datetime | None) -> datetime | None:
+    """Return a datetime the way MongoDB reads it back: naive UTC, millisecond precision."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
 def to_out(doc) -> ReleaseOut:
-    return ReleaseOut(
+    # Documents were validated on the way in; skip re-validating them on the way out
+    return ReleaseOut.model_construct(
         id=str(doc["_id"]),
         name=doc["name"],
         description=doc.get("description"),
@@ -114,21 +153,38 @@ async def create_release(payload: ReleaseCreate):
     doc = payload.model_dump()
     doc.update({"created_at": ts, "updated_at": ts})
     res = await db[COL].insert_one(doc)
-    created = await db[COL].find_one({"_id": res.inserted_id})
-    return to_out(created)
+    # The document is already in hand; no need to read it back. Match what a
+    # read returns so the same release serializes identically on every endpoint.
+    doc["_id"] = res.inserted_id
+    for field in ("created_at", "updated_at", "from_date", "to_date"):
+        doc[field] = as_stored(doc[field])
+    return to_out(doc)
 
 @app.get("/releases", response_model=list[ReleaseOut])
 async def list_releases(
-    q: str | None = Query(None, description="Search in name/description"),
+    q: str | None = Query(
+        None,
+        description="Search in name/description: case-insensitive match of q as a whole-word phrase "
+        "(\"hotfix\" and \"1.0\" match \"Hotfix 1.0.1\", \"hot\" does not)",
+    ),
     limit: int = Query(50, ge=1, le=200),
     skip: int = Query(0, ge=0),
 ):
     db = get_db()
     filt = {}
     if q:
-        filt = {"$or": [{"name": {"$regex": q, "$options": "i"}}, {"description": {"$regex": q, "$options": "i"}}]}
+        filt = search_filter(q)
     cursor = db[COL].find(filt).sort("updated_at", -1).skip(skip).limit(limit)
-    return [to_out(d) async for d in cursor]
+    try:
+        docs = await cursor.to_list(length=limit)
+    except OperationFailure as e:
+        if "$text" not in filt or e.code != INDEX_NOT_FOUND:
+            raise
+        # Text index not built (yet): same match, without the index pre-filter
+        filt.pop("$text")
+        cursor = db[COL].find(filt).sort("updated_at", -1).skip(skip).limit(limit)
+        docs = await cursor.to_list(length=limit)
+    return [to_out(d) for d in docs]
 
 @app.get("/releases/{release_id}", response_model=ReleaseOut)
 async def get_release(release_id: str):
@@ -145,10 +201,11 @@ async def update_release(release_id: str, payload: ReleaseUpdate):
     if not patch:
         raise HTTPException(status_code=400, detail="No fields to update")
     patch["updated_at"] = now()
-    res = await db[COL].update_one({"_id": oid(release_id)}, {"$set": patch})
-    if res.matched_count == 0:
+    doc = await db[COL].find_one_and_update(
+        {"_id": oid(release_id)}, {"$set": patch}, return_document=ReturnDocument.AFTER
+    )
+    if doc is None:
         raise HTTPException(status_code=404, detail="Release not found")
-    doc = await db[COL].find_one({"_id": oid(release_id)})
     return to_out(doc)
 
 @app.delete("/releases/{release_id}", status_code=204)
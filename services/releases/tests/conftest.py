@@ -1,27 +1,48 @@
 """
 Pytest configuration and fixtures for releases service tests.
 """
-import asyncio
 import pytest
-from httpx import AsyncClient
-from motor.motor_asyncio import AsyncIOMotorClient
+import pytest_asyncio
+from pytest_asyncio import is_async_test
+from httpx import AsyncClient, ASGITransport
 from datetime import datetime, timezone
 import os
 
-# Override DB settings for tests
-os.environ["MONGO_URI"] = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017")
-os.environ["MONGO_DB_NAME"] = "ai_testing_test"
+# Override DB settings for tests (read by shared.settings at import). Each
+# pytest-xdist worker gets its own database so parallel runs don't collide.
+TEST_DB_NAME = f"ai_testing_test_{os.getenv('PYTEST_XDIST_WORKER', 'gw0')}"
+os.environ["MONGO_URL"] = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = TEST_DB_NAME
 
 from main import app
-from shared.db import get_db
+from shared.db import get_client, get_db
+from shared.indexes import ensure_indexes
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def parse_timestamp(value: str) -> datetime:
+    """Parse an API timestamp into an aware datetime (naive values are UTC)."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test in the session event loop so it can share `_client` and the Motor client."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session", autouse=True)
+async def _drop_test_database():
+    """Start from a fresh test database with the service's indexes; drop it at the end."""
+    await get_client().drop_database(TEST_DB_NAME)
+    # Build the collection and its indexes (incl. the text index) once per session
+    await ensure_indexes(get_db(), ["releases"])
+    yield
+    await get_client().drop_database(TEST_DB_NAME)
 
 
 @pytest.fixture(scope="function")
@@ -29,24 +50,34 @@ async def db():
     """Provide a clean database for each test."""
     database = get_db()
     
-    # Clean up before test
-    await database["releases"].delete_many({})
-    
     yield database
     
-    # Clean up after test
+    # Clean up after test. Documents only: dropping the collection would
+    # also discard the indexes built once by the session fixture above,
+    # which also guarantees the first test starts from an empty database.
     await database["releases"].delete_many({})
 
 
-@pytest.fixture
-async def client(db):
-    """Provide an async HTTP client for testing the API."""
-    from httpx import ASGITransport
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def _client():
+    """One ASGI client for the whole session (the app holds no per-client state)."""
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
 
+@pytest.fixture
+def client(_client, request):
+    """Provide an async HTTP client for testing the API.
+    
+    Tests marked `no_db` are rejected before the request reaches MongoDB,
+    so they skip the per-test database cleanup.
+    """
+    if request.node.get_closest_marker("no_db") is None:
+        request.getfixturevalue("db")
+    return _client
+
+
 @pytest.fixture
 async def sample_release(db):
     """Create a sample release for testing."""
@@ -65,43 +96,49 @@ async def sample_release(db):
     return release_data
 
 
+# multiple_releases documents, built once at import. Tests get shallow
+# copies (insert_many adds "_id" to each); nested lists are shared, so
+# treat them as read-only.
+_MULTIPLE_RELEASES = (
+    {
+        "name": "Release 1.0",
+        "description": "First major release",
+        "from_date": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "to_date": datetime(2025, 3, 31, tzinfo=timezone.utc),
+        "requirement_ids": ["req1"],
+        "testcase_ids": ["tc1"],
+        "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "updated_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+    },
+    {
+        "name": "Release 2.0",
+        "description": "Second major release with new features",
+        "from_date": datetime(2025, 4, 1, tzinfo=timezone.utc),
+        "to_date": datetime(2025, 6, 30, tzinfo=timezone.utc),
+        "requirement_ids": ["req2", "req3"],
+        "testcase_ids": ["tc2"],
+        "created_at": datetime(2025, 2, 1, tzinfo=timezone.utc),
+        "updated_at": datetime(2025, 2, 1, tzinfo=timezone.utc),
+    },
+    {
+        "name": "Hotfix 1.0.1",
+        "description": "Critical bug fixes",
+        "from_date": datetime(2025, 3, 15, tzinfo=timezone.utc),
+        "to_date": datetime(2025, 3, 16, tzinfo=timezone.utc),
+        "requirement_ids": [],
+        "testcase_ids": ["tc3"],
+        "created_at": datetime(2025, 3, 1, tzinfo=timezone.utc),
+        "updated_at": datetime(2025, 3, 1, tzinfo=timezone.utc),
+    },
+)
+
+
 @pytest.fixture
 async def multiple_releases(db):
     """Create multiple releases for list/search testing."""
-    releases = [
-        {
-            "name": "Release 1.0",
-            "description": "First major release",
-            "from_date": datetime(2025, 1, 1, tzinfo=timezone.utc),
-            "to_date": datetime(2025, 3, 31, tzinfo=timezone.utc),
-            "requirement_ids": ["req1"],
-            "testcase_ids": ["tc1"],
-            "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
-            "updated_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
-        },
-        {
-            "name": "Release 2.0",
-            "description": "Second major release with new features",
-            "from_date": datetime(2025, 4, 1, tzinfo=timezone.utc),
-            "to_date": datetime(2025, 6, 30, tzinfo=timezone.utc),
-            "requirement_ids": ["req2", "req3"],
-            "testcase_ids": ["tc2"],
-            "created_at": datetime(2025, 2, 1, tzinfo=timezone.utc),
-            "updated_at": datetime(2025, 2, 1, tzinfo=timezone.utc),
-        },
-        {
-            "name": "Hotfix 1.0.1",
-            "description": "Critical bug fixes",
-            "from_date": datetime(2025, 3, 15, tzinfo=timezone.utc),
-            "to_date": datetime(2025, 3, 16, tzinfo=timezone.utc),
-            "requirement_ids": [],
-            "testcase_ids": ["tc3"],
-            "created_at": datetime(2025, 3, 1, tzinfo=timezone.utc),
-            "updated_at": datetime(2025, 3, 1, tzinfo=timezone.utc),
-        },
-    ]
+    releases = [dict(release) for release in _MULTIPLE_RELEASES]
     
-    result = await db["releases"].insert_many(releases)
+    result = await db["releases"].insert_many(releases, ordered=False)
     for i, release in enumerate(releases):
         release["_id"] = result.inserted_ids[i]
     
@@ -4,6 +4,8 @@ Tests for creating releases.
 import pytest
 from datetime import datetime, timezone
 
+from .conftest import parse_timestamp
+
 
 @pytest.mark.asyncio
 async def test_create_release_minimal(client, db):
@@ -63,6 +65,22 @@ async def test_create_release_full(client, db):
     assert data["updated_at"] is not None
 
 
+@pytest.mark.asyncio
+async def test_create_release_response_matches_get(client, db):
+    """Test that POST returns the same timestamps a later GET reads back."""
+    payload = {
+        "name": "Release 2.1",
+        "from_date": "2025-04-01T02:00:00.123456+02:00",
+        "to_date": "2025-06-30T23:59:59Z",
+    }
+    
+    created = (await client.post("/releases", json=payload)).json()
+    fetched = (await client.get(f"/releases/{created['id']}")).json()
+    
+    assert created == fetched
+    assert fetched["from_date"] == "2025-04-01T00:00:00.123000"
+
+
 @pytest.mark.asyncio
 async def test_create_release_empty_lists(client):
     """Test creating a release with explicitly empty lists."""
@@ -81,6 +99,7 @@ async def test_create_release_empty_lists(client):
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_db
 async def test_create_release_missing_name(client):
     """Test that creating a release without name fails."""
     payload = {
@@ -138,17 +157,8 @@ async def test_create_release_timestamps_are_set(client):
     assert response.status_code == 201
     data = response.json()
     
-    created_str = data["created_at"].replace("Z", "+00:00")
-    updated_str = data["updated_at"].replace("Z", "+00:00")
-    
-    # Parse and make timezone-aware if needed
-    created_at = datetime.fromisoformat(created_str)
-    if created_at.tzinfo is None:
-        created_at = created_at.replace(tzinfo=timezone.utc)
-    
-    updated_at = datetime.fromisoformat(updated_str)
-    if updated_at.tzinfo is None:
-        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    created_at = parse_timestamp(data["created_at"])
+    updated_at = parse_timestamp(data["updated_at"])
     
     # Check timestamps are within reasonable range (allow some tolerance for microseconds lost in serialization)
     assert abs((created_at - before).total_seconds()) <= 1
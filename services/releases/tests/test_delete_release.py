@@ -1,6 +1,8 @@
 """
 Tests for deleting releases.
 """
+import asyncio
+
 import pytest
 
 
@@ -30,6 +32,7 @@ async def test_delete_release_not_found(client):
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_db
 async def test_delete_release_invalid_id(client):
     """Test deleting with invalid ID format returns 400."""
     invalid_id = "not-valid-objectid"
@@ -71,8 +74,7 @@ async def test_delete_release_does_not_affect_others(client, multiple_releases,
     assert count_after == 2
     
     # Verify other releases still exist
-    remaining = await db["releases"].find().to_list(10)
-    remaining_ids = [str(doc["_id"]) for doc in remaining]
+    remaining_ids = [str(_id) for _id in await db["releases"].distinct("_id")]
     
     assert release_id not in remaining_ids
     assert str(multiple_releases[1]["_id"]) in remaining_ids
@@ -81,11 +83,11 @@ async def test_delete_release_does_not_affect_others(client, multiple_releases,
 
 @pytest.mark.asyncio
 async def test_delete_all_releases(client, multiple_releases, db):
-    """Test deleting all releases one by one."""
-    for release in multiple_releases:
-        release_id = str(release["_id"])
-        response = await client.delete(f"/releases/{release_id}")
-        assert response.status_code == 204
+    """Test deleting all releases, each with its own request."""
+    responses = await asyncio.gather(
+        *(client.delete(f"/releases/{release['_id']}") for release in multiple_releases)
+    )
+    assert all(response.status_code == 204 for response in responses)
     
     # Verify all deleted
     count = await db["releases"].count_documents({})
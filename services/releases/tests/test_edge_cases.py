@@ -5,6 +5,7 @@ import pytest
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_db
 async def test_create_release_with_very_long_name(client):
     """Test creating a release with a very long name is rejected."""
     long_name = "R" * 1000
@@ -89,9 +90,10 @@ async def test_search_with_regex_special_chars(client, multiple_releases):
     response = await client.get("/releases?q=1.0")
     
     assert response.status_code == 200
-    # Should find releases with "1.0" in name
+    # "." is literal: "1.0" matches "Release 1.0" and "Hotfix 1.0.1", not "Release 2.0"
     data = response.json()
-    assert len(data) > 0
+    assert len(data) == 2
+    assert sorted(r["name"] for r in data) == ["Hotfix 1.0.1", "Release 1.0"]
 
 
 @pytest.mark.asyncio
@@ -101,13 +103,18 @@ async def test_concurrent_updates(client, sample_release):
     
     release_id = str(sample_release["_id"])
     
-    # Create multiple concurrent update requests
+    # Bound in-flight requests like a real client would (Motor pool stays unsaturated)
+    in_flight = asyncio.Semaphore(16)
+    
     async def update_release(suffix):
         payload = {"description": f"Update {suffix}"}
-        return await client.put(f"/releases/{release_id}", json=payload)
+        async with in_flight:
+            return await client.put(f"/releases/{release_id}", json=payload)
     
-    tasks = [update_release(i) for i in range(10)]
-    responses = await asyncio.gather(*tasks)
+    # TaskGroup cancels the remaining updates if one raises
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(update_release(i)) for i in range(50)]
+    responses = [t.result() for t in tasks]
     
     # All should succeed
     assert all(r.status_code == 200 for r in responses)
@@ -115,7 +122,7 @@ async def test_concurrent_updates(client, sample_release):
     # Last one wins (or any one, depending on timing)
     final_response = await client.get(f"/releases/{release_id}")
     assert final_response.status_code == 200
-    assert "Update" in final_response.json()["description"]
+    assert final_response.json()["description"] in {f"Update {i}" for i in range(50)}
 
 
 @pytest.mark.asyncio
@@ -159,6 +166,7 @@ async def test_update_release_with_same_values(client, sample_release):
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_db
 async def test_malformed_json(client):
     """Test that malformed JSON is rejected."""
     response = await client.post(
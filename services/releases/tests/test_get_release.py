@@ -37,6 +37,7 @@ async def test_get_release_not_found(client):
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_db
 async def test_get_release_invalid_id(client):
     """Test getting a release with invalid ID format returns 400."""
     invalid_id = "not-a-valid-objectid"
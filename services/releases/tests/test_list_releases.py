@@ -1,8 +1,12 @@
 """
 Tests for listing releases.
 """
+import asyncio
+
 import pytest
 
+from shared.indexes import ensure_indexes
+
 
 @pytest.mark.asyncio
 async def test_list_releases_empty(client, db):
@@ -104,9 +108,11 @@ async def test_list_releases_search_by_description(client, multiple_releases):
 @pytest.mark.asyncio
 async def test_list_releases_search_case_insensitive(client, multiple_releases):
     """Test that search is case-insensitive."""
-    response1 = await client.get("/releases?q=HOTFIX")
-    response2 = await client.get("/releases?q=hotfix")
-    response3 = await client.get("/releases?q=HoTfIx")
+    response1, response2, response3 = await asyncio.gather(
+        client.get("/releases?q=HOTFIX"),
+        client.get("/releases?q=hotfix"),
+        client.get("/releases?q=HoTfIx"),
+    )
     
     assert response1.status_code == 200
     assert response2.status_code == 200
@@ -117,16 +123,34 @@ async def test_list_releases_search_case_insensitive(client, multiple_releases):
 
 
 @pytest.mark.asyncio
-async def test_list_releases_search_partial_match(client, multiple_releases):
-    """Test that search matches partial strings."""
-    response = await client.get("/releases?q=Release")
+async def test_list_releases_search_whole_word(client, multiple_releases):
+    """Test that search matches whole words, not partial strings."""
+    response1, response2 = await asyncio.gather(
+        client.get("/releases?q=Release"),
+        client.get("/releases?q=Hot"),
+    )
     
-    assert response.status_code == 200
-    data = response.json()
+    assert response1.status_code == 200
+    assert response2.status_code == 200
     
-    # Should match "Release 1.0" and "Release 2.0"
-    assert len(data) == 2
-    assert all("Release" in r["name"] for r in data)
+    # "Release" matches "Release 1.0" and "Release 2.0"; "Hot" does not match "Hotfix"
+    assert sorted(r["name"] for r in response1.json()) == ["Release 1.0", "Release 2.0"]
+    assert response2.json() == []
+
+
+@pytest.mark.asyncio
+async def test_list_releases_search_without_text_index(client, db, multiple_releases):
+    """Test that search returns the same results while the text index is missing."""
+    queries = ["Hotfix", "Hot", "1.0", "major release", "bug"]
+    with_index = [(await client.get("/releases", params={"q": q})).json() for q in queries]
+    
+    await db["releases"].drop_index("releases_text_idx")
+    try:
+        without_index = [(await client.get("/releases", params={"q": q})).json() for q in queries]
+    finally:
+        await ensure_indexes(db, ["releases"])
+    
+    assert without_index == with_index
 
 
 @pytest.mark.asyncio
@@ -139,18 +163,20 @@ async def test_list_releases_search_no_results(client, multiple_releases):
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_db
 async def test_list_releases_invalid_limit(client):
     """Test that invalid limit values are rejected."""
-    # Limit too low
-    response1 = await client.get("/releases?limit=0")
+    # Limit too low, limit too high
+    response1, response2 = await asyncio.gather(
+        client.get("/releases?limit=0"),
+        client.get("/releases?limit=300"),
+    )
     assert response1.status_code == 422
-    
-    # Limit too high
-    response2 = await client.get("/releases?limit=300")
     assert response2.status_code == 422
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_db
 async def test_list_releases_invalid_skip(client):
     """Test that invalid skip values are rejected."""
     response = await client.get("/releases?skip=-1")
@@ -165,7 +191,7 @@ async def test_list_releases_default_limit(client, db):
     # Create more than 50 releases
     now = datetime.now(timezone.utc)
     releases = [{"name": f"Release {i}", "created_at": now, "updated_at": now} for i in range(60)]
-    await db["releases"].insert_many(releases)
+    await db["releases"].insert_many(releases, ordered=False)
     
     response = await client.get("/releases")
     
@@ -1,8 +1,11 @@
 """
 Tests for updating releases.
 """
+from datetime import timedelta
+
 import pytest
-from datetime import datetime, timezone
+
+from .conftest import parse_timestamp
 
 
 @pytest.mark.asyncio
@@ -114,6 +117,7 @@ async def test_update_release_not_found(client):
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_db
 async def test_update_release_invalid_id(client):
     """Test updating with invalid ID format returns 400."""
     invalid_id = "invalid-id"
@@ -167,14 +171,15 @@ async def test_update_release_null_values_ignored(client, sample_release, db):
 
 
 @pytest.mark.asyncio
-async def test_update_release_updates_timestamp(client, sample_release):
+async def test_update_release_updates_timestamp(client, sample_release, monkeypatch):
     """Test that updated_at timestamp is changed on update."""
+    import main
+    
     release_id = str(sample_release["_id"])
     original_updated_at = sample_release["updated_at"]
     
-    # Small delay to ensure timestamp difference
-    import asyncio
-    await asyncio.sleep(0.1)
+    # Advance the service clock instead of sleeping to get a timestamp difference
+    monkeypatch.setattr(main, "now", lambda: original_updated_at + timedelta(seconds=1))
     
     payload = {"name": "Updated Name"}
     response = await client.put(f"/releases/{release_id}", json=payload)
@@ -182,10 +187,7 @@ async def test_update_release_updates_timestamp(client, sample_release):
     assert response.status_code == 200
     data = response.json()
     
-    updated_str = data["updated_at"].replace("Z", "+00:00")
-    new_updated_at = datetime.fromisoformat(updated_str)
-    if new_updated_at.tzinfo is None:
-        new_updated_at = new_updated_at.replace(tzinfo=timezone.utc)
+    new_updated_at = parse_timestamp(data["updated_at"])
     
     assert new_updated_at > original_updated_at
 
@@ -202,10 +204,7 @@ async def test_update_release_preserves_created_at(client, sample_release):
     assert response.status_code == 200
     data = response.json()
     
-    created_str = data["created_at"].replace("Z", "+00:00")
-    updated_created_at = datetime.fromisoformat(created_str)
-    if updated_created_at.tzinfo is None:
-        updated_created_at = updated_created_at.replace(tzinfo=timezone.utc)
+    updated_created_at = parse_timestamp(data["created_at"])
     
     # Should be same time (within microseconds)
     assert abs((updated_created_at - original_created_at).total_seconds()) < 0.001
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Any, Literal, Optional
@@ -8,6 +9,7 @@ from bson import ObjectId
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
+from pymongo import ReturnDocument
 
 from shared.db import get_db, close_client
 from shared.errors import setup_all_error_handlers
@@ -68,6 +70,7 @@ app.add_middleware(
 )
 
 COL = "release_assessments"
+OBJECT_ID_PATTERN = re.compile(r"[0-9a-fA-F]{24}")
 
 
 def now() -> datetime:
@@ -75,10 +78,10 @@ def now() -> datetime:
 
 
 def oid(id_: str) -> ObjectId:
-    try:
-        return ObjectId(id_)
-    except Exception:
+    # Plain branch for bad ids; ObjectId() can't fail on 24 hex digits
+    if not OBJECT_ID_PATTERN.fullmatch(id_):
         raise HTTPException(status_code=400, detail="Invalid id")
+    return ObjectId(id_)
 
 
 class AssessmentUpsert(BaseModel):
@@ -146,7 +149,8 @@ def _normalize_ia(value: Any) -> AssessmentUpsert.Ia:
 
 
 def to_out(doc) -> AssessmentOut:
-    return AssessmentOut(
+    # Nested sections are already normalized models; skip re-validating the rest
+    return AssessmentOut.model_construct(
         id=str(doc["_id"]),
         release_id=doc["release_id"],
         toab=_normalize_toab(doc.get("toab")),
@@ -182,7 +186,7 @@ async def list_assessments(
         filt["release_id"] = release_id
 
     cursor = db[COL].find(filt).sort("updated_at", -1).skip(skip).limit(limit)
-    return [to_out(d) async for d in cursor]
+    return [to_out(d) for d in await cursor.to_list(length=limit)]
 
 
 @app.get(
@@ -205,26 +209,12 @@ async def get_assessment_by_release(release_id: str):
 )
 async def upsert_assessment_by_release(release_id: str, payload: AssessmentUpsert):
     db = get_db()
-    existing = await db[COL].find_one({"release_id": release_id})
     ts = now()
 
     toab = _normalize_toab(payload.toab)
     rk = _normalize_rk(payload.rk)
     ia = _normalize_ia(payload.ia)
 
-    if not existing:
-        doc = {
-            "release_id": release_id,
-            "toab": toab.model_dump(),
-            "rk": rk.model_dump(),
-            "ia": ia.model_dump(),
-            "created_at": ts,
-            "updated_at": ts,
-        }
-        res = await db[COL].insert_one(doc)
-        created = await db[COL].find_one({"_id": res.inserted_id})
-        return to_out(created)
-
     patch = {
         "toab": toab.model_dump(),
         "rk": rk.model_dump(),
@@ -232,9 +222,15 @@ async def upsert_assessment_by_release(release_id: str, payload: AssessmentUpser
         "updated_at": ts,
     }
 
-    await db[COL].update_one({"_id": existing["_id"]}, {"$set": patch})
-    updated = await db[COL].find_one({"_id": existing["_id"]})
-    return to_out(updated)
+    # One round-trip: insert (release_id comes from the filter) or update,
+    # returning the resulting document
+    doc = await db[COL].find_one_and_update(
+        {"release_id": release_id},
+        {"$set": patch, "$setOnInsert": {"created_at": ts}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return to_out(doc)
 
 
 @app.delete(
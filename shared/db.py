@@ -2,12 +2,13 @@
 MongoDB client management with proper lifecycle (startup / shutdown).
 """
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from .settings import MONGO_URL, DB_NAME
 
 logger = logging.getLogger(__name__)
 
 _client: AsyncIOMotorClient | None = None
+_db: AsyncIOMotorDatabase | None = None
 
 
 def get_client() -> AsyncIOMotorClient:
@@ -23,14 +24,19 @@ def get_client() -> AsyncIOMotorClient:
     return _client
 
 
-def get_db():
-    return get_client()[DB_NAME]
+def get_db() -> AsyncIOMotorDatabase:
+    """Return the service database handle, built once per client."""
+    global _db
+    if _db is None:
+        _db = get_client()[DB_NAME]
+    return _db
 
 
 async def close_client() -> None:
     """Close the MongoDB client. Call during shutdown."""
-    global _client
+    global _client, _db
     if _client is not None:
         _client.close()
         _client = None
+        _db = None
         logger.info("MongoDB client closed")
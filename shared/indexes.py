@@ -26,6 +26,8 @@ INDEX_DEFINITIONS = {
     "releases": [
         ("name", {"unique": True}),
         ("created_at", {}),
+        # No stemming or stop words: the index only pre-filters whole-word phrase searches
+        ([("name", "text"), ("description", "text")], {"name": "releases_text_idx", "default_language": "none"}),
     ],
     "executions": [
         ("testcase_id", {}),
@@ -42,6 +44,7 @@ INDEX_DEFINITIONS = {
     ],
     "release_assessments": [
         ("release_id", {"unique": True}),
+        ([("release_id", 1), ("updated_at", -1)], {"name": "assessment_release_updated_idx"}),
     ],
     "knowledge_graph": [
         ("type", {}),